@@ -0,0 +1,134 @@
+"""intern expense categories
+
+Revision ID: a1c6e8f3d2b4
+Revises: f7a2c4e9b1d3
+Create Date: 2026-10-18 19:22:08.113540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6e8f3d2b4'
+down_revision: Union[str, Sequence[str], None] = 'f7a2c4e9b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+expenses = sa.table('expenses',
+    sa.column('id', sa.Integer()),
+    sa.column('user_id', sa.Integer()),
+    sa.column('amount', sa.BigInteger()),
+    sa.column('expense_date', sa.Date()),
+    sa.column('category', sa.String()),
+    sa.column('category_id', sa.Integer()),
+)
+categories = sa.table('categories',
+    sa.column('id', sa.Integer()),
+    sa.column('user_id', sa.Integer()),
+    sa.column('name', sa.String()),
+    sa.column('key', sa.String()),
+)
+
+
+def _create_rollups(category_column: sa.Column) -> None:
+    """Create the monthly rollup table keyed by the given category column."""
+    op.create_table('expense_monthly_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    category_column,
+    sa.Column('total', sa.BigInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month', category_column.name)
+    )
+
+
+def _backfill_rollups(category_name: str, category) -> None:
+    """Recompute the rollups from expenses, grouped on the given category expression."""
+    rollups = sa.table('expense_monthly_rollups',
+        sa.column('user_id'), sa.column('year'), sa.column('month'),
+        sa.column(category_name), sa.column('total'), sa.column('count'),
+    )
+    year = sa.cast(sa.extract('year', expenses.c.expense_date), sa.Integer())
+    month = sa.cast(sa.extract('month', expenses.c.expense_date), sa.Integer())
+    op.execute(
+        rollups.insert().from_select(
+            ['user_id', 'year', 'month', category_name, 'total', 'count'],
+            sa.select(
+                expenses.c.user_id, year, month, category,
+                sa.func.sum(expenses.c.amount), sa.func.count(expenses.c.id),
+            ).group_by(expenses.c.user_id, year, month, category),
+        )
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'key', name='uq_categories_user_id_key')
+    )
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_expenses_category_id_categories', 'categories', ['category_id'], ['id'], ondelete='SET NULL'
+        )
+
+    # Intern every distinct spelling; case and whitespace variants share one
+    # category, named after the first of them in sort order
+    connection = op.get_bind()
+    interned = {}
+    rows = connection.execute(
+        sa.select(expenses.c.user_id, expenses.c.category)
+        .where(expenses.c.category.is_not(None))
+        .group_by(expenses.c.user_id, expenses.c.category)
+        .order_by(expenses.c.user_id, expenses.c.category)
+    )
+    for user_id, raw_name in rows.all():
+        name = ' '.join(raw_name.split())
+        if not name:
+            continue
+        key = (user_id, name.casefold())
+        if key not in interned:
+            category_id = connection.execute(
+                categories.insert().values(user_id=user_id, name=name, key=key[1])
+                .returning(categories.c.id)
+            ).scalar_one()
+            interned[key] = (category_id, name)
+        category_id, canonical_name = interned[key]
+        connection.execute(
+            expenses.update()
+            .where(expenses.c.user_id == user_id, expenses.c.category == raw_name)
+            .values(category_id=category_id, category=canonical_name)
+        )
+    # Blank names carry no category
+    connection.execute(
+        expenses.update().where(expenses.c.category_id.is_(None)).values(category=None)
+    )
+
+    # Rollups are derived data: rebuild them keyed by category id (0 = none)
+    op.drop_table('expense_monthly_rollups')
+    _create_rollups(sa.Column('category_id', sa.Integer(), nullable=False))
+    _backfill_rollups('category_id', sa.func.coalesce(expenses.c.category_id, 0))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expense_monthly_rollups')
+    _create_rollups(sa.Column('category', sa.String(length=100), nullable=False))
+    _backfill_rollups('category', sa.func.coalesce(expenses.c.category, ''))
+
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.drop_constraint('fk_expenses_category_id_categories', type_='foreignkey')
+        batch_op.drop_column('category_id')
+    op.drop_table('categories')
@@ -0,0 +1,37 @@
+"""add expense user date index
+
+Revision ID: b7e3c91a4d2f
+Revises: 7284d9baa882
+Create Date: 2026-10-18 09:12:40.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c91a4d2f'
+down_revision: Union[str, Sequence[str], None] = '7284d9baa882'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Composite index for per-user date-range scans. PostgreSQL also gets
+    # INCLUDE (category, amount) so the monthly summary is an index-only scan;
+    # other backends ignore the postgresql_include option.
+    op.create_index(
+        'ix_expenses_user_id_expense_date',
+        'expenses',
+        ['user_id', 'expense_date'],
+        unique=False,
+        postgresql_include=['category', 'amount'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_id_expense_date', table_name='expenses')
@@ -0,0 +1,43 @@
+"""cover category id in expense date index
+
+Revision ID: c2d7e9f4a6b8
+Revises: b8d2f5a7c3e1
+Create Date: 2026-10-18 16:05:12.473921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d7e9f4a6b8'
+down_revision: Union[str, Sequence[str], None] = 'b8d2f5a7c3e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_index(include: list[str]) -> None:
+    # Only PostgreSQL has INCLUDE columns; elsewhere the index is unchanged
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_expenses_user_id_expense_date', table_name='expenses')
+    op.create_index(
+        'ix_expenses_user_id_expense_date',
+        'expenses',
+        ['user_id', 'expense_date'],
+        unique=False,
+        postgresql_include=include,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Grouping moved to category_id, so that is the column the index must cover
+    _recreate_index(['category_id', 'amount'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_index(['category', 'amount'])
@@ -0,0 +1,62 @@
+"""add expense monthly rollups
+
+Revision ID: c4a8e2f19b63
+Revises: b7e3c91a4d2f
+Create Date: 2026-10-18 11:47:05.603118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e2f19b63'
+down_revision: Union[str, Sequence[str], None] = 'b7e3c91a4d2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('expense_monthly_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month', 'category')
+    )
+
+    # Backfill from existing expenses
+    expenses = sa.table('expenses',
+        sa.column('id', sa.Integer()),
+        sa.column('user_id', sa.Integer()),
+        sa.column('amount', sa.Float()),
+        sa.column('expense_date', sa.Date()),
+        sa.column('category', sa.String()),
+    )
+    rollups = sa.table('expense_monthly_rollups',
+        sa.column('user_id'), sa.column('year'), sa.column('month'),
+        sa.column('category'), sa.column('total'), sa.column('count'),
+    )
+    year = sa.cast(sa.extract('year', expenses.c.expense_date), sa.Integer())
+    month = sa.cast(sa.extract('month', expenses.c.expense_date), sa.Integer())
+    category = sa.func.coalesce(expenses.c.category, '')
+    op.execute(
+        rollups.insert().from_select(
+            ['user_id', 'year', 'month', 'category', 'total', 'count'],
+            sa.select(
+                expenses.c.user_id, year, month, category,
+                sa.func.sum(expenses.c.amount), sa.func.count(expenses.c.id),
+            ).group_by(expenses.c.user_id, year, month, category),
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expense_monthly_rollups')
@@ -0,0 +1,59 @@
+"""store amounts as integer cents
+
+Revision ID: d9e1f4b27a65
+Revises: c4a8e2f19b63
+Create Date: 2026-10-18 15:12:40.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e1f4b27a65'
+down_revision: Union[str, Sequence[str], None] = 'c4a8e2f19b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, amount column) pairs converted between float amounts and integer cents
+MONEY_COLUMNS = [
+    ('expenses', 'amount'),
+    ('expense_monthly_rollups', 'total'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, column_name in MONEY_COLUMNS:
+        table = sa.table(table_name, sa.column(column_name, sa.Float()))
+        column = table.c[column_name]
+        op.execute(table.update().values({column_name: sa.func.round(column * 100)}))
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(
+                column_name,
+                existing_type=sa.Float(),
+                type_=sa.BigInteger(),
+                existing_nullable=False,
+                postgresql_using=f'{column_name}::bigint',
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, column_name in MONEY_COLUMNS:
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(
+                column_name,
+                existing_type=sa.BigInteger(),
+                type_=sa.Float(),
+                existing_nullable=False,
+                postgresql_using=f'{column_name}::double precision',
+            )
+
+        table = sa.table(table_name, sa.column(column_name, sa.Float()))
+        column = table.c[column_name]
+        op.execute(table.update().values({column_name: column / 100.0}))
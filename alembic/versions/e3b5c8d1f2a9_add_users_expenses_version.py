@@ -0,0 +1,29 @@
+"""add users expenses_version
+
+Revision ID: e3b5c8d1f2a9
+Revises: d9e1f4b27a65
+Create Date: 2026-10-18 16:40:12.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b5c8d1f2a9'
+down_revision: Union[str, Sequence[str], None] = 'd9e1f4b27a65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('expenses_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('expenses_version')
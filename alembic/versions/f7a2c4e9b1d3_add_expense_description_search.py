@@ -0,0 +1,40 @@
+"""add expense description search index
+
+Revision ID: f7a2c4e9b1d3
+Revises: e3b5c8d1f2a9
+Create Date: 2026-10-18 18:05:41.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a2c4e9b1d3'
+down_revision: Union[str, Sequence[str], None] = 'e3b5c8d1f2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'sqlite':
+        # Kept in sync by ExpenseRepository, so it is backfilled once here
+        op.execute("CREATE VIRTUAL TABLE expenses_fts USING fts5(description)")
+        op.execute("INSERT INTO expenses_fts (rowid, description) SELECT id, description FROM expenses")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_expenses_description_search ON expenses "
+            "USING gin (to_tsvector('simple', description))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE expenses_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX ix_expenses_description_search")
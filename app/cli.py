@@ -0,0 +1,43 @@
+# app/cli.py
+"""
+Maintenance commands for the Expense Tracker API.
+
+Usage:
+    python -m app.cli rebuild-rollups [--user-id ID]
+"""
+
+import argparse
+
+from app.db.session import SessionLocal
+from app.repository import ExpenseRepository
+
+
+def rebuild_rollups(args: argparse.Namespace) -> None:
+    """
+    Recompute the monthly rollup table from raw expenses. Running API workers
+    pick up the result without a restart: the rebuild bumps the users' expense
+    change versions, which key their cached summaries.
+    """
+    db = SessionLocal()
+    try:
+        rows = ExpenseRepository(db).rebuild_monthly_rollups(args.user_id)
+    finally:
+        db.close()
+    scope = f"user {args.user_id}" if args.user_id is not None else "all users"
+    print(f"Rebuilt {rows} monthly rollup rows for {scope}.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Expense Tracker maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute monthly rollups from raw expenses")
+    rebuild.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    rebuild.set_defaults(handler=rebuild_rollups)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,58 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
     REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
+    # JWT keys. HS* algorithms sign with SECRET_KEY; RS256/ES256/EdDSA sign with the
+    # PEM private key (needs the cryptography package). JWT_PUBLIC_KEYS_FILE is a JWKS
+    # of every key still accepted, matched by "kid", so keys can be rotated.
+    JWT_KEY_ID: str | None = os.getenv("JWT_KEY_ID")
+    JWT_PRIVATE_KEY_FILE: str | None = os.getenv("JWT_PRIVATE_KEY_FILE")
+    JWT_PUBLIC_KEYS_FILE: str | None = os.getenv("JWT_PUBLIC_KEYS_FILE")
+    # Verified token claims kept until the token expires
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+
+    # Refresh token store
+    REVOKED_TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("REVOKED_TOKEN_CACHE_MAX_SIZE", 100000))
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS", 3600))
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = int(os.getenv("REFRESH_TOKEN_SWEEP_BATCH_SIZE", 1000))
+
+    # Login throttling: token buckets per client address and per email, each allowing
+    # a burst of N attempts refilled over the window (0 disables). In-process unless
+    # a redis:// URL is set, which shares the buckets between workers.
+    LOGIN_RATE_LIMIT_URL: str | None = os.getenv("LOGIN_RATE_LIMIT_URL")
+    LOGIN_RATE_LIMIT_IP_ATTEMPTS: int = int(os.getenv("LOGIN_RATE_LIMIT_IP_ATTEMPTS", 20))
+    LOGIN_RATE_LIMIT_EMAIL_ATTEMPTS: int = int(os.getenv("LOGIN_RATE_LIMIT_EMAIL_ATTEMPTS", 5))
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW_SECONDS", 60))
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", 100000))
+
+    # Password hashing policy: "bcrypt" or "argon2" (argon2id, needs argon2-cffi).
+    # PASSWORD_HASH_COST is bcrypt's log2 rounds or argon2's passes; when unset and
+    # PASSWORD_HASH_TARGET_MS is given, startup calibrates the cost to that latency,
+    # never below PASSWORD_HASH_MIN_COST. Weaker hashes are upgraded on login.
+    PASSWORD_HASH_SCHEME: str = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt").lower()
+    PASSWORD_HASH_COST: int | None = int(os.getenv("PASSWORD_HASH_COST", 0)) or None
+    PASSWORD_HASH_MIN_COST: int | None = int(os.getenv("PASSWORD_HASH_MIN_COST", 0)) or None
+    PASSWORD_HASH_TARGET_MS: float = float(os.getenv("PASSWORD_HASH_TARGET_MS", 0))
+    PASSWORD_ARGON2_MEMORY_KIB: int = int(os.getenv("PASSWORD_ARGON2_MEMORY_KIB", 65536))
+    PASSWORD_ARGON2_PARALLELISM: int = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 1))
+
+    # Password hashing worker pool
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", 1))
+
+    # Principal cache
+    PRINCIPAL_CACHE_MAX_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 10000))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+
+    # Interned category ids cache
+    CATEGORY_CACHE_MAX_SIZE: int = int(os.getenv("CATEGORY_CACHE_MAX_SIZE", 50000))
+    CATEGORY_CACHE_TTL_SECONDS: float = float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", 3600))
+
+    # Monthly summary cache (in-process LRU unless a redis:// URL is set)
+    SUMMARY_CACHE_URL: str | None = os.getenv("SUMMARY_CACHE_URL")
+    SUMMARY_CACHE_MAX_SIZE: int = int(os.getenv("SUMMARY_CACHE_MAX_SIZE", 10000))
+    SUMMARY_CACHE_TTL_SECONDS: int = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", 3600))
+
     # Server
     SERVER_HOST: str = os.getenv("SERVER_HOST", "http://localhost:8000")
     BACKEND_CORS_ORIGINS: List[str] = os.getenv("BACKEND_CORS_ORIGINS", "*").split(",")
@@ -29,6 +81,52 @@ class Settings:
     # Database
     DATABASE_URL: str = os.getenv(
         "DATABASE_URL", "sqlite:///./expense_tracker.db" )
+    # Serve the API routes through an asyncio engine (asyncpg / aiosqlite)
+    DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+    # Defaults to DATABASE_URL with its async driver swapped in
+    ASYNC_DATABASE_URL: str | None = os.getenv("ASYNC_DATABASE_URL")
+
+    # Read replicas, comma-separated; GET routes are spread across them
+    DATABASE_READ_URLS: List[str] = [
+        url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()
+    ]
+    # How long a client's reads stay on the primary after it writes
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    # Most recent writers remembered at once; the oldest are forgotten first
+    READ_YOUR_WRITES_MAX_CLIENTS: int = int(os.getenv("READ_YOUR_WRITES_MAX_CLIENTS", 10000))
+
+    # Connection pool
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # How long a SQLite connection waits on a locked database before failing
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = float(os.getenv("SQLITE_BUSY_TIMEOUT_SECONDS", 15))
+
+    # SQLite production profile
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    # Negative values are in KiB, as in SQLite's cache_size pragma
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", -64000))
+    # Funnel API writes through one writer thread with group commit
+    SQLITE_WRITE_QUEUE: bool = os.getenv("SQLITE_WRITE_QUEUE", "true").lower() in ("1", "true", "yes")
+    SQLITE_WRITE_BATCH_SIZE: int = int(os.getenv("SQLITE_WRITE_BATCH_SIZE", 64))
+
+    # Pagination
+    EXPENSE_PAGE_DEFAULT_SIZE: int = int(os.getenv("EXPENSE_PAGE_DEFAULT_SIZE", 50))
+    EXPENSE_PAGE_MAX_SIZE: int = int(os.getenv("EXPENSE_PAGE_MAX_SIZE", 500))
+
+    # Bulk import
+    BULK_IMPORT_CHUNK_SIZE: int = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", 1000))
+    BULK_IMPORT_MAX_ITEMS: int = int(os.getenv("BULK_IMPORT_MAX_ITEMS", 50000))
+
+    # Analytics
+    ANALYTICS_MAX_BUCKETS: int = int(os.getenv("ANALYTICS_MAX_BUCKETS", 1000))
+
+    # Export
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
 
 
 # Instantiate a single settings object to be used throughout the app
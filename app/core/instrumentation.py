@@ -0,0 +1,135 @@
+# app/core/instrumentation.py
+
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import Histogram, MetricFamily
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+# ---------------------------
+# Request metrics
+# ---------------------------
+request_latency = Histogram(
+    "http_request_duration_seconds", "Time spent serving requests.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    "http_response_size_bytes", "Size of response bodies.",
+    ("method", "route"), SIZE_BUCKETS,
+)
+request_db_statements = Histogram(
+    "http_request_db_statements", "SQL statements executed per request.",
+    ("method", "route"), STATEMENT_BUCKETS,
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+
+_in_flight = 0
+
+# Scope key a middleware answering before routing sets to the path it guards,
+# so its responses are labelled with that route rather than "unmatched"
+ROUTE_LABEL = "metrics_route"
+
+# [statement count, seconds] of the current request, shared with the threads it
+# runs database work on (the threadpool and the SQLite writer copy the context)
+_request_db_stats: ContextVar[list | None] = ContextVar("request_db_stats", default=None)
+
+
+def collect_request_metrics() -> list[MetricFamily | Histogram]:
+    """Metric families for the registry."""
+    return [
+        MetricFamily("http_requests_in_flight", "gauge", "Requests currently being served.",
+                     [({}, _in_flight)]),
+        request_latency,
+        response_size,
+        request_db_statements,
+        request_db_seconds,
+    ]
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request and recording its response
+    size and database work, labelled by method and route template (so
+    /expenses/1 and /expenses/2 share a series). Requests answered before
+    routing carry the ROUTE_LABEL their middleware set; any other request
+    that matches no route is labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        start = time.perf_counter()
+        status = 500
+        size = 0
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _in_flight -= 1
+            _request_db_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or scope.get(ROUTE_LABEL, "unmatched")
+            labels = (scope["method"], route)
+            request_latency.observe((*labels, str(status)), time.perf_counter() - start)
+            response_size.observe(labels, size)
+            request_db_statements.observe(labels, db_stats[0])
+            request_db_seconds.observe(labels, db_stats[1])
+
+
+# ---------------------------
+# Database statement timing
+# ---------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_db_stats.get() is not None:
+        conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_db_stats.get()
+    starts = conn.info.get("statement_start")
+    if stats is None or not starts:
+        return
+    stats[0] += 1
+    stats[1] += time.perf_counter() - starts.pop()
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    starts = context.connection.info.get("statement_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time the statements an engine runs on behalf of requests."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
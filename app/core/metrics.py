@@ -0,0 +1,171 @@
+# app/core/metrics.py
+
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+
+# ---------------------------
+# Metric families
+# ---------------------------
+@dataclass
+class MetricFamily:
+    """
+    A named metric and its samples, rendered in the Prometheus text format.
+    Each sample is a (labels, value) pair.
+    """
+    name: str
+    kind: str
+    help: str
+    samples: list[tuple[dict[str, str], float]] = field(default_factory=list)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.samples:
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """
+    Distribution of observed values per label set, rendered as a Prometheus
+    histogram family (cumulative `_bucket` series plus `_sum` and `_count`).
+    Observing is a bisect and two additions under a lock.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (the last one is +Inf), sum]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        """Record one value for the given label values, in label_names order."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for values, counts, total in series:
+            labels = dict(zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+class MetricsRegistry:
+    """
+    Collects metric families from registered callbacks at scrape time,
+    so the hot path only has to bump plain counters.
+    """
+
+    def __init__(self):
+        self._collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    def register(self, collector: Callable[[], Iterable[MetricFamily | Histogram]]) -> None:
+        """Register a callback returning the metric families to expose."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every registered metric in the Prometheus text format."""
+        families = [family for collector in self._collectors for family in collector()]
+        return "\n".join(family.render() for family in families) + "\n"
+
+
+def cache_metrics(name: str, stats: dict) -> list[MetricFamily]:
+    """Build metric families from a cache's stats() dictionary."""
+    return [
+        MetricFamily(f"{name}_entries", "gauge", f"Entries currently held in the {name}.",
+                     [({}, stats["size"])]),
+        MetricFamily(f"{name}_hits_total", "counter", f"Lookups served from the {name}.",
+                     [({}, stats["hits"])]),
+        MetricFamily(f"{name}_misses_total", "counter", f"Lookups not found in the {name}.",
+                     [({}, stats["misses"])]),
+        MetricFamily(f"{name}_evictions_total", "counter", f"Entries evicted from the full {name}.",
+                     [({}, stats["evictions"])]),
+        MetricFamily(f"{name}_expirations_total", "counter", f"Entries expired from the {name}.",
+                     [({}, stats["expirations"])]),
+    ]
+
+
+def rate_limit_metrics(name: str, stats: dict) -> list[MetricFamily]:
+    """Build metric families from a rate limiter's stats() dictionary."""
+    return [
+        MetricFamily(f"{name}_allowed_total", "counter", f"Requests let through by the {name}.",
+                     [({}, stats["allowed"])]),
+        MetricFamily(f"{name}_rejected_total", "counter", f"Requests rejected by the {name}.",
+                     [({}, stats["rejected"])]),
+    ]
+
+
+def pool_metrics(pools: dict[str, dict]) -> list[MetricFamily]:
+    """Build metric families from connection pool stats, labelled by engine name."""
+    def samples(key: str) -> list[tuple[dict[str, str], float]]:
+        return [({"engine": name}, stats[key]) for name, stats in pools.items()]
+
+    return [
+        MetricFamily("db_pool_size", "gauge", "Connections the pool keeps open.",
+                     samples("size")),
+        MetricFamily("db_pool_checked_out", "gauge", "Connections currently in use.",
+                     samples("checked_out")),
+        MetricFamily("db_pool_checked_in", "gauge", "Idle connections held by the pool.",
+                     samples("checked_in")),
+        MetricFamily("db_pool_overflow", "gauge", "Connections open beyond the pool size.",
+                     samples("overflow")),
+        MetricFamily("db_pool_checkouts_total", "counter", "Connections handed out by the pool.",
+                     samples("checkouts")),
+        MetricFamily("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection.",
+                     samples("wait_seconds")),
+        MetricFamily("db_pool_timeouts_total", "counter", "Checkouts that timed out waiting for a connection.",
+                     samples("timeouts")),
+    ]
+
+
+# Instantiate a single registry to be used throughout the app
+registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
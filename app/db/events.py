@@ -0,0 +1,40 @@
+# app/db/events.py
+
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Session.info flag for sessions whose commit only releases a savepoint
+# inside a larger transaction committed by someone else (the SQLite writer)
+GROUP_COMMIT = "group_commit"
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def call_after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """
+    Run callback once the session's work is durably committed, e.g. to
+    invalidate caches without letting a concurrent read repopulate them
+    from data that is not visible yet. Dropped if the work is rolled back.
+    """
+    db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+def pop_after_commit_callbacks(db: Session) -> list[Callable[[], None]]:
+    """Take the callbacks registered on a session, for callers that commit it themselves."""
+    return db.info.pop(_AFTER_COMMIT, [])
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    if session.info.get(GROUP_COMMIT):
+        return
+    for callback in pop_after_commit_callbacks(session):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit_callbacks(session: Session) -> None:
+    if session.info.get(GROUP_COMMIT):
+        return
+    pop_after_commit_callbacks(session)
@@ -1,9 +1,12 @@
 from datetime import date, datetime
+from decimal import Decimal
 from typing import List, Optional
 
-from sqlalchemy import String, ForeignKey, Float, Date, DateTime
+from sqlalchemy import DDL, String, ForeignKey, Integer, Date, DateTime, Index, UniqueConstraint, column, event, table
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from app.db.types import Money
+
 
 # -----------------------------------
 # Base Class
@@ -25,15 +28,15 @@ class User(Base):
     password: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
 
-    # Token fields
-    refresh_token: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
-    refresh_token_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Bumped by every expense write, used as the ETag of the user's expense reads
+    expenses_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
-    # Relationships
+    # Relationships (never loaded implicitly; opt in per query with selectinload)
     expenses: Mapped[List["Expense"]] = relationship(
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="joined"
+        passive_deletes=True,
+        lazy="raise_on_sql"
     )
 
     def __repr__(self) -> str:
@@ -45,21 +48,138 @@ class User(Base):
 # -----------------------------------
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Serves per-user date-range scans; on PostgreSQL it also covers the
+        # per-category grouping via INCLUDE (category_id, amount)
+        Index(
+            "ix_expenses_user_id_expense_date",
+            "user_id",
+            "expense_date",
+            postgresql_include=["category_id", "amount"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    # Stored as integer cents, read back as Decimal
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
     description: Mapped[str] = mapped_column(String(255), nullable=False)
     expense_date: Mapped[date] = mapped_column(Date, default=date.today, nullable=False)
+    # Canonical spelling of the interned category, kept on the row so reads need no join;
+    # grouping and filtering use category_id
     category: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    category_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("categories.id", ondelete="SET NULL"), nullable=True
+    )
 
     # Foreign Key
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
-    # Relationship
-    user: Mapped["User"] = relationship(back_populates="expenses", lazy="joined")
+    # Relationship (never loaded implicitly; opt in per query with joinedload)
+    user: Mapped["User"] = relationship(back_populates="expenses", lazy="raise_on_sql")
 
     def __repr__(self) -> str:
         return (
             f"<Expense(id={self.id}, amount={self.amount}, "
             f"description='{self.description}', date={self.expense_date}, category='{self.category}')>"
         )
+
+
+# -----------------------------------
+# Refresh Token Model
+# -----------------------------------
+class RefreshToken(Base):
+    """
+    An issued refresh token, stored by the SHA-256 of its token id (jti).
+    Tokens are rotated on every use. All tokens descending from one login
+    share a family, which is revoked as a whole when a used token is replayed.
+    """
+    __tablename__ = "refresh_tokens"
+
+    token_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    family_id: Mapped[str] = mapped_column(String(32), index=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    # Naive UTC, like the JWT "exp" claim it mirrors
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True, nullable=False)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken(family_id={self.family_id}, user_id={self.user_id}, expires_at={self.expires_at})>"
+
+
+# -----------------------------------
+# Category Model
+# -----------------------------------
+class Category(Base):
+    """
+    A user's expense category, interned once per case- and
+    whitespace-insensitive name so expenses and rollups group on its id.
+    """
+    __tablename__ = "categories"
+    __table_args__ = (UniqueConstraint("user_id", "key", name="uq_categories_user_id_key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Spelling the category was first created with
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    # Casefolded name with whitespace collapsed
+    key: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Category(id={self.id}, user_id={self.user_id}, name='{self.name}')>"
+
+
+# -----------------------------------
+# Expense Search Index
+# -----------------------------------
+# Full-text index over expense descriptions. On SQLite it is an FTS5 table
+# keyed by expense id and kept in sync by ExpenseRepository; on PostgreSQL
+# it is a GIN index over the description's tsvector.
+SEARCH_TEXT_CONFIG = "simple"
+
+expenses_fts = table("expenses_fts", column("rowid", Integer), column("description", String))
+
+event.listen(
+    Base.metadata, "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(description)").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Base.metadata, "before_drop",
+    DDL("DROP TABLE IF EXISTS expenses_fts").execute_if(dialect="sqlite"),
+)
+event.listen(
+    Base.metadata, "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_expenses_description_search ON expenses "
+        f"USING gin (to_tsvector('{SEARCH_TEXT_CONFIG}', description))"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+# -----------------------------------
+# Monthly Rollup Model
+# -----------------------------------
+class ExpenseMonthlyRollup(Base):
+    """
+    Per-user, per-month, per-category totals of expenses.
+    Maintained incrementally by ExpenseRepository in the same transaction
+    as every expense write, so monthly summaries never scan raw expenses.
+    """
+    __tablename__ = "expense_monthly_rollups"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # 0 stands for "no category" so it can be part of the key
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    total: Mapped[Decimal] = mapped_column(Money, nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ExpenseMonthlyRollup(user_id={self.user_id}, year={self.year}, month={self.month}, "
+            f"category_id={self.category_id}, total={self.total}, count={self.count})>"
+        )
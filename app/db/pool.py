@@ -0,0 +1,94 @@
+# app/db/pool.py
+
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+
+# ---------------------------
+# Instrumented pools
+# ---------------------------
+class _TimedPoolMixin:
+    """
+    Records how long callers wait for a connection and how often
+    the pool times out, on top of the pool's own size counters.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+                self.wait_seconds += time.perf_counter() - started
+            raise
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds += time.perf_counter() - started
+        return connection
+
+    def stats(self) -> dict:
+        """Return the pool's current occupancy and wait counters."""
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                # QueuePool counts overflow from -pool_size until the pool is full
+                "overflow": max(self.overflow(), 0),
+                "checkouts": self.checkouts,
+                "wait_seconds": self.wait_seconds,
+                "timeouts": self.timeouts,
+            }
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool with wait-time and timeout counters."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with wait-time and timeout counters."""
+
+
+# ---------------------------
+# Engine options
+# ---------------------------
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Build create_engine() keyword arguments for the given URL from settings.
+
+    - Server databases get a bounded queue pool with pre-ping and recycling,
+      so stale connections are replaced instead of failing a request.
+    - File-based SQLite gets the same bounded pool plus a busy timeout;
+      pre-ping and recycling are skipped since there is no server to drop them.
+    - In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    parsed = make_url(url)
+    options: dict = {"echo": False}
+
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            return options
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS}
+    else:
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE_SECONDS
+
+    options["poolclass"] = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+    options["pool_size"] = settings.DB_POOL_SIZE
+    options["max_overflow"] = settings.DB_MAX_OVERFLOW
+    options["pool_timeout"] = settings.DB_POOL_TIMEOUT_SECONDS
+    return options
@@ -0,0 +1,107 @@
+# app/db/routing.py
+
+import itertools
+import threading
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.db.pool import engine_options
+from app.db.session import get_db
+from app.db.sqlite import apply_sqlite_pragmas
+from app.utils.cache import TTLCache
+from app.utils.security import verify_access_token
+
+
+# ---------------------------
+# Replica engines
+# ---------------------------
+def _create_read_engine(url: str) -> Engine:
+    read_engine = create_engine(url, **engine_options(url))
+    if read_engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(read_engine)
+    instrument_engine(read_engine)
+    return read_engine
+
+
+read_engines: list[Engine] = [_create_read_engine(url) for url in settings.DATABASE_READ_URLS]
+
+# Replica sessions are bound per request to the engine picked by round robin
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+_round_robin = itertools.count()
+_round_robin_lock = threading.Lock()
+
+
+def next_read_engine() -> Engine | None:
+    """Return the next replica in round-robin order, or None without replicas."""
+    if not read_engines:
+        return None
+    with _round_robin_lock:
+        index = next(_round_robin)
+    return read_engines[index % len(read_engines)]
+
+
+# ---------------------------
+# Read-your-writes stickiness
+# ---------------------------
+
+# Clients that wrote within the last READ_YOUR_WRITES_SECONDS, so their
+# reads stay on the primary until the replicas have caught up
+recent_writers = TTLCache(
+    maxsize=settings.READ_YOUR_WRITES_MAX_CLIENTS,
+    ttl=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def client_key(request: Request) -> str:
+    """
+    Identify the client a request comes from: the access token subject
+    when a valid bearer token is sent, otherwise the client address.
+    """
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"sub:{verify_access_token(token).username}"
+        except HTTPException:
+            pass
+    return f"addr:{request.client.host if request.client else ''}"
+
+
+async def track_writes(request: Request, call_next):
+    """
+    HTTP middleware marking clients whose write succeeded,
+    so their next reads are served by the primary.
+    """
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400 and read_engines:
+        recent_writers.set(client_key(request), True)
+    return response
+
+
+# ---------------------------
+# Dependencies
+# ---------------------------
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Session for read-only routes: a replica picked by round robin, or the
+    primary session when no replicas are configured or the client has
+    written recently.
+    """
+    read_engine = next_read_engine()
+    if read_engine is None or recent_writers.get(client_key(request)):
+        yield db
+        return
+
+    read_db = ReadSessionLocal(bind=read_engine)
+    try:
+        yield read_db
+    finally:
+        read_db.close()
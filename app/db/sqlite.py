@@ -0,0 +1,211 @@
+# app/db/sqlite.py
+
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.events import GROUP_COMMIT, pop_after_commit_callbacks
+
+logger = logging.getLogger(__name__)
+
+
+def is_file_sqlite(url) -> bool:
+    """Whether the URL points at an on-disk SQLite database."""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+# ---------------------------
+# Connection pragmas
+# ---------------------------
+def sqlite_pragmas() -> dict[str, Any]:
+    """
+    Pragmas applied to every new SQLite connection:
+    WAL lets readers run alongside the writer, NORMAL sync is durable
+    in WAL mode, and mmap/cache sizes keep hot pages in memory.
+    """
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": int(settings.SQLITE_BUSY_TIMEOUT_SECONDS * 1000),
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine) -> None:
+    """Set the SQLite pragmas on each connection the engine opens."""
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+# ---------------------------
+# Single-writer queue
+# ---------------------------
+class _WriteJob:
+    def __init__(self, fn: Callable[[Session], Any]):
+        self.fn = fn
+        self.future: Future = Future()
+        self.result: Any = None
+        self.after_commit: list[Callable[[], None]] = []
+
+
+class SQLiteWriter:
+    """
+    Runs every write against one SQLite database on a single thread.
+
+    SQLite allows one writer at a time, so concurrent writers only end up
+    waiting on the file lock or failing with "database is locked". Queued
+    jobs are instead drained in batches: each job runs in its own savepoint
+    on the writer's connection, and the whole batch is committed at once
+    (group commit). Callers are resolved only after that commit, so a
+    failing job rolls back alone while the others still land.
+    """
+
+    _STOP = object()
+
+    def __init__(self, engine: Engine, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.batches = 0
+        self.jobs = 0
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        """Queue fn(session) for the writer thread and return its future."""
+        self._ensure_started()
+        job = _WriteJob(fn)
+        self._queue.put(job)
+        return job.future
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Finish the queued writes and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        # Held across batches, so writes never wait on the request pool
+        connection = None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = any(job is self._STOP for job in batch)
+                jobs = [job for job in batch if job is not self._STOP]
+                if jobs:
+                    connection = self._commit_batch(connection, jobs)
+                if stop:
+                    return
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _commit_batch(self, connection, jobs: list[_WriteJob]):
+        try:
+            if connection is None:
+                connection = self.engine.connect()
+            # The sqlite3 driver only opens a transaction before DML on its own;
+            # begin explicitly so the savepoints below nest inside one commit.
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            done = [job for job in jobs if self._run_job(connection, job)]
+            connection.commit()
+        except Exception as exc:
+            logger.exception("SQLite group commit failed")
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            if connection is not None:
+                connection.invalidate()
+                connection.close()
+            return None
+
+        self.batches += 1
+        self.jobs += len(done)
+        for job in done:
+            for callback in job.after_commit:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("After-commit callback failed")
+            job.future.set_result(job.result)
+        return connection
+
+    @staticmethod
+    def _run_job(connection, job: _WriteJob) -> bool:
+        # Session commits release the job's savepoint; errors roll back to it
+        session = Session(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+            info={GROUP_COMMIT: True},
+        )
+        try:
+            job.result = job.fn(session)
+            # Deferred until the whole batch is committed
+            job.after_commit = pop_after_commit_callbacks(session)
+            return True
+        except Exception as exc:
+            session.rollback()
+            job.future.set_exception(exc)
+            return False
+        finally:
+            session.close()
+
+
+_writers: dict[Engine, SQLiteWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_sqlite_writer(engine: Engine) -> SQLiteWriter | None:
+    """
+    Return the shared writer for an on-disk SQLite engine,
+    or None when writes should run directly on the session.
+    """
+    if not settings.SQLITE_WRITE_QUEUE or not is_file_sqlite(engine.url):
+        return None
+    with _writers_lock:
+        writer = _writers.get(engine)
+        if writer is None:
+            writer = _writers[engine] = SQLiteWriter(engine, settings.SQLITE_WRITE_BATCH_SIZE)
+        return writer
+
+
+@atexit.register
+def _close_writers() -> None:
+    for writer in list(_writers.values()):
+        writer.close()
@@ -0,0 +1,33 @@
+# app/db/types.py
+
+from decimal import Decimal
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+from app.utils.money import from_minor_units, to_minor_units
+
+
+class Money(TypeDecorator):
+    """
+    Monetary amount stored as an integer number of cents.
+
+    Values are bound from Decimal (or int/float) and read back as exact
+    two-decimal Decimals, so SUM() in SQL is integer arithmetic with no drift.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Decimal
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_minor_units(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return from_minor_units(value)
@@ -1,22 +1,61 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.config import settings
+from app.core.instrumentation import RequestMetricsMiddleware, collect_request_metrics
+from app.core.metrics import registry, cache_metrics, pool_metrics, rate_limit_metrics, PROMETHEUS_CONTENT_TYPE
 from app.db.models import Base
-from app.db.session import engine
+from app.db.routing import read_engines, track_writes
+from app.db.session import engine, async_engine
 from app.routers import api_router
+from app.services.token_sweeper import sweep_expired_refresh_tokens
+from app.utils.cache import principal_cache, revoked_token_cache, summary_cache
+from app.utils.rate_limit import LoginRateLimitMiddleware, login_rate_limiter
+from app.utils.security import configure_password_hashing, token_verifier
 
 # -------------------------------
 # Application Initialization
 # -------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fit the password hashing cost to this host before serving logins
+    await run_in_threadpool(configure_password_hashing)
+
+    # Purge expired refresh tokens in the background while the app runs
+    sweeper = None
+    if settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS > 0:
+        sweeper = asyncio.create_task(sweep_expired_refresh_tokens(
+            settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS, settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE
+        ))
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+
+
 app = FastAPI(
     title="Expense Tracker API",
     version="1.0.0",
-    description="API for tracking user expenses, managing authentication, and reporting."
+    description="API for tracking user expenses, managing authentication, and reporting.",
+    lifespan=lifespan,
 )
 
 # Include all routers
 app.include_router(api_router)
 
+# Keep clients on the primary for a short while after they write
+app.middleware("http")(track_writes)
+
+# Throttle login attempts before they reach the user lookup and bcrypt
+app.add_middleware(LoginRateLimitMiddleware, limiter=login_rate_limiter)
+
+# Time requests and their database work; added last so it is the outermost
+# layer and also records requests the middleware above turns away
+app.add_middleware(RequestMetricsMiddleware)
+
 # -------------------------------
 # Database Initialization
 # -------------------------------
@@ -41,7 +80,8 @@ def root():
             "users": "/users",
             "expenses": "/expenses",
             "auth": "/auth",
-            "health": "/health"
+            "health": "/health",
+            "metrics": "/metrics"
         }
     }
 
@@ -54,3 +94,37 @@ def health_check():
     Simple health check endpoint.
     """
     return {"status": "ok"}
+
+
+# -------------------------------
+# Metrics Endpoint
+# -------------------------------
+registry.register(lambda: cache_metrics("principal_cache", principal_cache.stats()))
+registry.register(lambda: cache_metrics("revoked_token_cache", revoked_token_cache.stats()))
+registry.register(lambda: cache_metrics("token_cache", token_verifier.cache.stats()))
+registry.register(lambda: rate_limit_metrics("login_rate_limiter", login_rate_limiter.stats()))
+if hasattr(summary_cache, "stats"):
+    registry.register(lambda: cache_metrics("summary_cache", summary_cache.stats()))
+
+
+def collect_pool_metrics():
+    # Only instrumented pools report stats (in-memory SQLite keeps its default pool)
+    engines = {"primary": engine, "async": async_engine}
+    engines.update({f"replica{index}": replica for index, replica in enumerate(read_engines)})
+    return pool_metrics({
+        name: db_engine.pool.stats()
+        for name, db_engine in engines.items()
+        if db_engine is not None and hasattr(db_engine.pool, "stats")
+    })
+
+
+registry.register(collect_pool_metrics)
+registry.register(collect_request_metrics)
+
+
+@app.get("/metrics", tags=["Health"])
+def metrics():
+    """
+    Expose runtime metrics in the Prometheus text format.
+    """
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
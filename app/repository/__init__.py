@@ -5,7 +5,34 @@ Repository package initializer.
 This module exposes the repository classes used for database interactions.
 """
 
+from .category_repo import CategoryRepository
 from .expense_repo import ExpenseRepository
+from .token_repo import RefreshTokenRepository
 from .user_repo import UserRepository
+from .async_repo import (
+    AsyncExpenseRepository,
+    AsyncUserRepository,
+    AsyncRefreshTokenRepository,
+    get_expense_repository,
+    get_user_repository,
+    get_refresh_token_repository,
+    get_expense_read_repository,
+    get_user_read_repository,
+    run_write,
+)
 
-__all__ = ["ExpenseRepository", "UserRepository"]
+__all__ = [
+    "CategoryRepository",
+    "ExpenseRepository",
+    "RefreshTokenRepository",
+    "UserRepository",
+    "AsyncExpenseRepository",
+    "AsyncUserRepository",
+    "AsyncRefreshTokenRepository",
+    "get_expense_repository",
+    "get_user_repository",
+    "get_refresh_token_repository",
+    "get_expense_read_repository",
+    "get_user_read_repository",
+    "run_write",
+]
@@ -0,0 +1,127 @@
+# app/repository/async_repo.py
+
+import asyncio
+import contextvars
+from typing import Any, Callable, TypeVar
+
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.routing import get_read_db
+from app.db.session import get_db, get_async_db
+from app.db.sqlite import get_sqlite_writer
+from .expense_repo import ExpenseRepository
+from .token_repo import RefreshTokenRepository
+from .user_repo import UserRepository
+from .writes import is_write_method
+
+T = TypeVar("T")
+
+
+async def run_write(db: Session, fn: Callable[[Session], T]) -> T:
+    """
+    Run a write on a sync session without blocking the event loop.
+    On-disk SQLite writes go through the shared single-writer queue,
+    everything else runs on the given session in the threadpool.
+    """
+    writer = get_sqlite_writer(db.get_bind())
+    if writer is None:
+        return await run_in_threadpool(fn, db)
+    # Carry the request's context (e.g. its statement metrics) to the writer thread
+    context = contextvars.copy_context()
+    return await asyncio.wrap_future(writer.submit(lambda session: context.run(fn, session)))
+
+
+class AsyncRepository:
+    """
+    Awaitable version of a repository, so routes can run as coroutines.
+
+    Every public method of `repository_class` is available as a coroutine:
+    - with an AsyncSession, it runs through AsyncSession.run_sync on the
+      async driver, so the event loop never blocks on I/O;
+    - with a plain Session, it runs in the threadpool, and methods marked
+      with @write_method go through run_write (the SQLite writer queue).
+
+    Methods returning lazy iterators (e.g. iter_expenses) must stay on a sync session.
+    """
+
+    repository_class: type
+
+    def __init__(self, db: Session | AsyncSession):
+        self.db = db
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        method = getattr(self.repository_class, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            if isinstance(self.db, AsyncSession):
+                return await self.db.run_sync(
+                    lambda session: method(self.repository_class(session), *args, **kwargs)
+                )
+            if is_write_method(method):
+                return await run_write(
+                    self.db, lambda session: method(self.repository_class(session), *args, **kwargs)
+                )
+            return await run_in_threadpool(method, self.repository_class(self.db), *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+
+class AsyncExpenseRepository(AsyncRepository):
+    """Awaitable ExpenseRepository."""
+    repository_class = ExpenseRepository
+
+
+class AsyncUserRepository(AsyncRepository):
+    """
+    Awaitable UserRepository. Its writes take passwords already hashed, so a
+    signup never holds the SQLite writer thread for a bcrypt round.
+    """
+    repository_class = UserRepository
+
+
+class AsyncRefreshTokenRepository(AsyncRepository):
+    """Awaitable RefreshTokenRepository."""
+    repository_class = RefreshTokenRepository
+
+
+# ---------- DEPENDENCIES ---------- #
+
+# The *_read_repository variants serve GET routes from the read replicas
+if settings.DATABASE_ASYNC:
+    async def get_expense_repository(db: AsyncSession = Depends(get_async_db)) -> AsyncExpenseRepository:
+        return AsyncExpenseRepository(db)
+
+    async def get_user_repository(db: AsyncSession = Depends(get_async_db)) -> AsyncUserRepository:
+        return AsyncUserRepository(db)
+
+    async def get_refresh_token_repository(
+        db: AsyncSession = Depends(get_async_db),
+    ) -> AsyncRefreshTokenRepository:
+        return AsyncRefreshTokenRepository(db)
+
+    # Replicas are only routed on the sync session path
+    get_expense_read_repository = get_expense_repository
+    get_user_read_repository = get_user_repository
+else:
+    async def get_expense_repository(db: Session = Depends(get_db)) -> AsyncExpenseRepository:
+        return AsyncExpenseRepository(db)
+
+    async def get_user_repository(db: Session = Depends(get_db)) -> AsyncUserRepository:
+        return AsyncUserRepository(db)
+
+    async def get_refresh_token_repository(db: Session = Depends(get_db)) -> AsyncRefreshTokenRepository:
+        return AsyncRefreshTokenRepository(db)
+
+    async def get_expense_read_repository(db: Session = Depends(get_read_db)) -> AsyncExpenseRepository:
+        return AsyncExpenseRepository(db)
+
+    async def get_user_read_repository(db: Session = Depends(get_read_db)) -> AsyncUserRepository:
+        return AsyncUserRepository(db)
@@ -0,0 +1,80 @@
+# app/repository/category_repo.py
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db.events import call_after_commit
+from app.db.models import Category
+from app.utils.cache import category_cache
+
+
+def normalize_category(name: str | None) -> str | None:
+    """Collapse the whitespace in a category name; None for a missing or blank name."""
+    if name is None:
+        return None
+    return " ".join(name.split()) or None
+
+
+def category_key(name: str) -> str:
+    """Case- and whitespace-insensitive key a user's category is interned under."""
+    return " ".join(name.split()).casefold()
+
+
+class CategoryRepository:
+    """Repository layer for interning a user's expense categories."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        # Categories interned by this repository's uncommitted work
+        self._pending: dict[tuple[int, str], tuple[int, str]] = {}
+
+    def intern(self, user_id: int, name: str | None) -> tuple[int, str] | None:
+        """
+        Return the (id, canonical name) of a user's category, creating it on
+        first use. Served from the in-process cache when possible, so writes
+        do not pay a lookup round-trip. None for a missing or blank name.
+        """
+        name = normalize_category(name)
+        if name is None:
+            return None
+        cache_key = (user_id, category_key(name))
+
+        category = self._pending.get(cache_key) or category_cache.get(cache_key)
+        if category is None:
+            category = self._get_or_create(user_id, name)
+            self._pending[cache_key] = category
+            # Only share it once the row is committed and visible to everyone
+            call_after_commit(self.db, lambda: category_cache.set(cache_key, category))
+        return category
+
+    def id_query(self, user_id: int, name: str):
+        """Scalar subquery of the id of a user's category, for filtering without a round-trip."""
+        return (
+            select(Category.id)
+            .where(Category.user_id == user_id, Category.key == category_key(name))
+            .scalar_subquery()
+        )
+
+    def _get_or_create(self, user_id: int, name: str) -> tuple[int, str]:
+        """Insert the category unless it exists, in a single statement where supported."""
+        values = {"user_id": user_id, "name": name, "key": category_key(name)}
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = dialect_insert(Category).values(**values)
+            # A no-op update, so the existing row is returned on conflict
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "key"], set_={"name": Category.name}
+            ).returning(Category.id, Category.name)
+            return tuple(self.db.execute(stmt).one())
+
+        existing = self.db.execute(
+            select(Category.id, Category.name).where(
+                Category.user_id == user_id, Category.key == values["key"]
+            )
+        ).one_or_none()
+        if existing is not None:
+            return tuple(existing)
+        category_id = self.db.execute(insert(Category).values(**values)).inserted_primary_key[0]
+        return category_id, name
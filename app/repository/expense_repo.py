@@ -1,10 +1,77 @@
 # app/repository/expense_repo.py
 
+import json
+import re
+from collections import defaultdict
 from datetime import date
+from decimal import Decimal
+from typing import Iterable, Iterator
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.models import Expense
-from app.schemas import ExpenseCreate, ExpenseUpdate
+from sqlalchemy import Date, Integer, Row, String, cast, delete, func, insert, literal, literal_column, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db.events import call_after_commit
+from app.db.models import SEARCH_TEXT_CONFIG, Category, Expense, ExpenseMonthlyRollup, User, expenses_fts
+from app.schemas import ExpenseCreate, ExpenseUpdate, ExpenseFilter, ExpenseBatchFilter
+from app.utils.cache import summary_cache, summary_cache_key
+from app.utils.money import from_minor_units
+from .category_repo import CategoryRepository
+from .writes import write_method
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date | None]:
+    """
+    Return the half-open [start, end) date range covering a calendar month.
+    `end` is None for December of the last representable year.
+    """
+    start = date(year, month, 1)
+    if month < 12:
+        return start, date(year, month + 1, 1)
+    if year < date.max.year:
+        return start, date(year + 1, 1, 1)
+    return start, None
+
+
+# Expense fields that decide which monthly rollup an expense counts towards
+ROLLUP_FIELDS = frozenset({"amount", "expense_date", "category"})
+
+# (year, month, category id) -> [total, count] changes to apply to the rollup table
+RollupDeltas = defaultdict[tuple[int, int, int], list]
+
+
+def _new_rollup_deltas() -> RollupDeltas:
+    return defaultdict(lambda: [Decimal(0), 0])
+
+
+def _add_rollup_delta(
+    deltas: RollupDeltas, expense_date: date, category_id: int | None, amount: Decimal, count: int
+) -> None:
+    """Accumulate the effect of adding (count=1) or removing (count=-1) one expense."""
+    entry = deltas[(expense_date.year, expense_date.month, category_id or 0)]
+    entry[0] += amount
+    entry[1] += count
+
+
+def rollup_groups_query(conditions: list):
+    """Grouped (year, month, category id, total, count) of the expenses matching conditions, locking them."""
+    # FOR UPDATE is not allowed next to GROUP BY, so the rows are locked in a subquery
+    matched = (
+        select(Expense.id, Expense.expense_date, Expense.category_id, Expense.amount)
+        .where(*conditions)
+        .with_for_update()
+        .subquery()
+    )
+    year = cast(func.extract("year", matched.c.expense_date), Integer)
+    month = cast(func.extract("month", matched.c.expense_date), Integer)
+    category = func.coalesce(matched.c.category_id, 0)
+    return (
+        select(year, month, category, func.sum(matched.c.amount), func.count(matched.c.id))
+        .group_by(year, month, category)
+    )
+
+
+def _search_terms(text: str) -> list[str]:
+    """Split a search string into lowercase words, dropping any query syntax."""
+    return re.findall(r"[^\W_]+", text.lower())
 
 
 class ExpenseRepository:
@@ -12,6 +79,7 @@ class ExpenseRepository:
 
     def __init__(self, db: Session):
         self.db = db
+        self.categories = CategoryRepository(db)
 
     # ---------- CRUD OPERATIONS ---------- #
 
@@ -28,65 +96,672 @@ class ExpenseRepository:
             .all()
         )
 
+    def get_expenses_page(
+        self,
+        user_id: int,
+        filters: ExpenseFilter,
+        limit: int,
+        after: tuple[date, int] | None = None,
+    ) -> tuple[list[Expense], tuple[date, int] | None]:
+        """
+        Retrieve one page of a user's expenses, newest first.
+
+        Uses keyset pagination on (expense_date, id): `after` is the position
+        of the last row of the previous page. Returns the page and the
+        position to resume from, or None when there are no more rows.
+        """
+        query = self._filtered_query(user_id, filters)
+        if after is not None:
+            query = query.filter(tuple_(Expense.expense_date, Expense.id) < tuple_(*after))
+
+        rows = (
+            query.order_by(Expense.expense_date.desc(), Expense.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        if len(rows) <= limit:
+            return rows, None
+        page = rows[:limit]
+        return page, (page[-1].expense_date, page[-1].id)
+
+    def iter_expenses(self, user_id: int, filters: ExpenseFilter, batch_size: int) -> Iterator[Row]:
+        """
+        Stream a user's expenses, newest first, as plain rows.
+
+        Rows are fetched from a server-side cursor `batch_size` at a time and
+        no ORM objects are built, so memory stays flat for any history size.
+        """
+        return (
+            self._filtered_query(user_id, filters)
+            .with_entities(
+                Expense.id,
+                Expense.expense_date,
+                Expense.amount,
+                Expense.category,
+                Expense.description,
+            )
+            .order_by(Expense.expense_date.desc(), Expense.id.desc())
+            .yield_per(batch_size)
+        )
+
+    @write_method
     def create_expense(self, expense_create: ExpenseCreate, user_id: int) -> Expense:
         """Create a new expense for a user."""
         new_expense = Expense(
             amount=expense_create.amount,
             description=expense_create.description,
             expense_date=expense_create.expense_date or date.today(),
-            category=expense_create.category,
             user_id=user_id,
+            **self._category_values(user_id, expense_create.category),
         )
         self.db.add(new_expense)
+        if self._maintains_search_index:
+            self.db.flush()
+            self._index_descriptions([(new_expense.id, new_expense.description)])
+
+        deltas = _new_rollup_deltas()
+        _add_rollup_delta(deltas, new_expense.expense_date, new_expense.category_id, new_expense.amount, 1)
+        self._apply_rollup_deltas(user_id, deltas)
+        self._bump_expenses_version(user_id)
+
         self.db.commit()
         self.db.refresh(new_expense)
         return new_expense
 
-    def update_expense(self, expense_id: int, expense_update: ExpenseUpdate) -> Expense | None:
-        """Update an existing expense by ID."""
-        expense = self.get_expense_by_id(expense_id)
-        if not expense:
-            return None
+    @write_method
+    def bulk_create_expenses(self, batches: Iterable[list[ExpenseCreate]], user_id: int) -> int:
+        """
+        Insert expenses for a user batch by batch.
 
-        # Apply partial updates
-        for field, value in expense_update.dict(exclude_unset=True).items():
-            setattr(expense, field, value)
+        Each batch is sent as a single executemany INSERT, and everything is
+        committed in one transaction at the end, together with the monthly
+        rollup changes. Returns the number created.
+        """
+        created = 0
+        deltas = _new_rollup_deltas()
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+                rows = [
+                    {
+                        "amount": expense.amount,
+                        "description": expense.description,
+                        "expense_date": expense.expense_date or date.today(),
+                        "user_id": user_id,
+                        **self._category_values(user_id, expense.category),
+                    }
+                    for expense in batch
+                ]
+                if self._maintains_search_index:
+                    result = self.db.execute(insert(Expense).returning(Expense.id, Expense.description), rows)
+                    self._index_descriptions(result.all())
+                else:
+                    self.db.execute(insert(Expense), rows)
+                for row in rows:
+                    _add_rollup_delta(deltas, row["expense_date"], row["category_id"], row["amount"], 1)
+                created += len(batch)
 
-        self.db.commit()
-        self.db.refresh(expense)
+            self._apply_rollup_deltas(user_id, deltas)
+            if created:
+                self._bump_expenses_version(user_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return created
+
+    @write_method
+    def update_expense(self, expense_id: int, user_id: int, expense_update: ExpenseUpdate) -> Expense | None:
+        """
+        Update one of a user's expenses, scoped by (id, user_id) so the
+        ownership check is part of the UPDATE itself. Returns None when the
+        user has no such expense.
+
+        The updated row comes back through UPDATE ... RETURNING where the
+        dialect supports it. The old values are only read (and locked) first
+        when the change moves the expense between monthly rollups.
+        """
+        values = expense_update.model_dump(exclude_unset=True)
+        if "category" in values:
+            values.update(self._category_values(user_id, values["category"]))
+        scope = (Expense.id == expense_id, Expense.user_id == user_id)
+        if not values:
+            return self.db.execute(select(Expense).where(*scope)).scalar_one_or_none()
+
+        try:
+            old = None
+            if values.keys() & ROLLUP_FIELDS:
+                old = self.db.execute(
+                    select(Expense.expense_date, Expense.category_id, Expense.amount)
+                    .where(*scope)
+                    .with_for_update()
+                ).one_or_none()
+                if old is None:
+                    return None
+
+            stmt = update(Expense).where(*scope).values(**values).execution_options(synchronize_session=False)
+            if self.db.get_bind().dialect.update_returning:
+                expense = self.db.execute(stmt.returning(Expense)).scalar_one_or_none()
+            elif self.db.execute(stmt).rowcount:
+                expense = self.db.execute(select(Expense).where(*scope)).scalar_one()
+            else:
+                expense = None
+            if expense is None:
+                return None
+
+            if "description" in values and self._maintains_search_index:
+                self._index_descriptions([(expense.id, expense.description)])
+            if old is not None:
+                deltas = _new_rollup_deltas()
+                _add_rollup_delta(deltas, old.expense_date, old.category_id, -old.amount, -1)
+                _add_rollup_delta(deltas, expense.expense_date, expense.category_id, expense.amount, 1)
+                self._apply_rollup_deltas(user_id, deltas)
+            self._bump_expenses_version(user_id)
+
+            # Detach so the commit does not expire it and force a reload
+            self.db.expunge(expense)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         return expense
 
-    def delete_expense(self, expense_id: int) -> bool:
-        """Delete an expense by ID."""
-        expense = self.get_expense_by_id(expense_id)
-        if not expense:
-            return False
-        self.db.delete(expense)
-        self.db.commit()
+    @write_method
+    def delete_expense(self, expense_id: int, user_id: int) -> bool:
+        """
+        Delete one of a user's expenses, scoped by (id, user_id).
+        Returns False when the user has no such expense.
+
+        The deleted row's rollup values come back through DELETE ... RETURNING
+        where the dialect supports it, so the delete is a single statement.
+        """
+        scope = (Expense.id == expense_id, Expense.user_id == user_id)
+        columns = (Expense.expense_date, Expense.category_id, Expense.amount)
+
+        try:
+            stmt = delete(Expense).where(*scope).execution_options(synchronize_session=False)
+            if self.db.get_bind().dialect.delete_returning:
+                old = self.db.execute(stmt.returning(*columns)).one_or_none()
+            else:
+                old = self.db.execute(select(*columns).where(*scope).with_for_update()).one_or_none()
+                if old is not None:
+                    self.db.execute(stmt)
+            if old is None:
+                return False
+
+            if self._maintains_search_index:
+                self.db.execute(delete(expenses_fts).where(expenses_fts.c.rowid == expense_id))
+            deltas = _new_rollup_deltas()
+            _add_rollup_delta(deltas, old.expense_date, old.category_id, -old.amount, -1)
+            self._apply_rollup_deltas(user_id, deltas)
+            self._bump_expenses_version(user_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         return True
 
+    # ---------- BATCH OPERATIONS ---------- #
+
+    def _batch_conditions(
+        self, user_id: int, ids: list[int] | None, filters: ExpenseBatchFilter | None
+    ) -> list:
+        """WHERE conditions of a batch operation, always scoped to the user."""
+        if ids is not None:
+            return [Expense.user_id == user_id, Expense.id.in_(ids)]
+        conditions = self._filter_conditions(user_id, filters)
+        if filters.description_like is not None:
+            conditions.append(Expense.description.like(filters.description_like))
+        return conditions
+
+    def _matched_rollup_groups(self, conditions: list) -> list[Row]:
+        """
+        (year, month, category id, total, count) of the rows matching conditions,
+        in one grouped query. The rows are locked (FOR UPDATE, where supported)
+        until the batch commits, so concurrent writes cannot change them between
+        this read and the UPDATE or DELETE the deltas are computed for.
+        """
+        return self.db.execute(rollup_groups_query(conditions)).all()
+
+    @write_method
+    def batch_update_expenses(
+        self,
+        user_id: int,
+        changes: ExpenseUpdate,
+        ids: list[int] | None = None,
+        filters: ExpenseBatchFilter | None = None,
+    ) -> int:
+        """
+        Apply the same changes to many of a user's expenses in one UPDATE,
+        selected by id or by filter. Returns the number of expenses matched.
+
+        The monthly rollups are adjusted from one grouped query over the
+        matched rows, since every matched row receives the same new values.
+        """
+        values = changes.model_dump(exclude_unset=True)
+        if "category" in values:
+            values.update(self._category_values(user_id, values["category"]))
+        conditions = self._batch_conditions(user_id, ids, filters)
+
+        try:
+            deltas = _new_rollup_deltas()
+            for year, month, category, total, count in self._matched_rollup_groups(conditions):
+                deltas[(year, month, category)][0] -= total
+                deltas[(year, month, category)][1] -= count
+
+                new_date = values.get("expense_date")
+                new_key = (
+                    new_date.year if new_date else year,
+                    new_date.month if new_date else month,
+                    (values["category_id"] or 0) if "category_id" in values else category,
+                )
+                new_total = values["amount"] * count if "amount" in values else total
+                deltas[new_key][0] += new_total
+                deltas[new_key][1] += count
+
+            # Reindex first, while the conditions still select the same rows
+            if "description" in values and self._maintains_search_index:
+                self.db.execute(
+                    update(expenses_fts)
+                    .where(expenses_fts.c.rowid.in_(select(Expense.id).where(*conditions)))
+                    .values(description=values["description"])
+                )
+
+            result = self.db.execute(
+                update(Expense)
+                .where(*conditions)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                self._apply_rollup_deltas(user_id, deltas)
+                self._bump_expenses_version(user_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result.rowcount
+
+    @write_method
+    def batch_delete_expenses(
+        self,
+        user_id: int,
+        ids: list[int] | None = None,
+        filters: ExpenseBatchFilter | None = None,
+    ) -> int:
+        """
+        Delete many of a user's expenses in one DELETE, selected by id or by
+        filter. Returns the number of expenses deleted.
+        """
+        conditions = self._batch_conditions(user_id, ids, filters)
+
+        try:
+            deltas = _new_rollup_deltas()
+            for year, month, category, total, count in self._matched_rollup_groups(conditions):
+                deltas[(year, month, category)][0] -= total
+                deltas[(year, month, category)][1] -= count
+
+            if self._maintains_search_index:
+                self.db.execute(
+                    delete(expenses_fts).where(expenses_fts.c.rowid.in_(select(Expense.id).where(*conditions)))
+                )
+
+            result = self.db.execute(
+                delete(Expense)
+                .where(*conditions)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                self._apply_rollup_deltas(user_id, deltas)
+                self._bump_expenses_version(user_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result.rowcount
+
+    # ---------- SEARCH ---------- #
+
+    def search_expenses(
+        self, user_id: int, text: str, limit: int, offset: int = 0
+    ) -> tuple[list[Expense], bool]:
+        """
+        Full-text search over a user's expense descriptions, best match first.
+
+        Every word of `text` must match the start of a word in the
+        description ("ube" finds "Uber Eats"). Ranked with bm25 on SQLite
+        (FTS5) and ts_rank on PostgreSQL. Returns one page and whether more
+        results follow.
+        """
+        terms = _search_terms(text)
+        if not terms:
+            return [], False
+
+        query = select(Expense).where(Expense.user_id == user_id)
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            fts = literal_column("expenses_fts")
+            query = (
+                query.join(expenses_fts, expenses_fts.c.rowid == Expense.id)
+                .where(fts.op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+                .order_by(func.bm25(fts))
+            )
+        elif dialect == "postgresql":
+            config = literal_column(f"'{SEARCH_TEXT_CONFIG}'")
+            # Must match the expression of ix_expenses_description_search
+            vector = func.to_tsvector(config, Expense.description)
+            tsquery = func.to_tsquery(config, " & ".join(f"{term}:*" for term in terms))
+            query = query.where(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+        else:
+            # No text index on this database: match substrings, newest first
+            query = query.where(
+                *(Expense.description.ilike(f"%{term}%") for term in terms)
+            ).order_by(Expense.expense_date.desc())
+
+        rows = self.db.execute(
+            query.order_by(Expense.id.desc()).limit(limit + 1).offset(offset)
+        ).scalars().all()
+        return rows[:limit], len(rows) > limit
+
+    @property
+    def _maintains_search_index(self) -> bool:
+        """Whether writes must update the search index themselves (SQLite FTS5)."""
+        return self.db.get_bind().dialect.name == "sqlite"
+
+    def _index_descriptions(self, rows: Iterable[tuple[int, str]]) -> None:
+        """(Re)index the descriptions of the given (expense id, description) rows."""
+        rows = [{"rowid": expense_id, "description": description} for expense_id, description in rows]
+        if rows:
+            self.db.execute(insert(expenses_fts).prefix_with("OR REPLACE"), rows)
+
+    def unindex_user_expenses(self, user_id: int) -> None:
+        """
+        Remove every expense of the user from the search index, in the caller's
+        transaction. Call it before the expenses themselves are deleted.
+        """
+        if self._maintains_search_index:
+            self.db.execute(
+                delete(expenses_fts).where(
+                    expenses_fts.c.rowid.in_(select(Expense.id).where(Expense.user_id == user_id))
+                )
+            )
+
+    # ---------- CHANGE VERSION ---------- #
+
+    def get_expenses_version(self, user_id: int) -> int:
+        """Return the user's expense change version, bumped by every expense write."""
+        version = self.db.execute(
+            select(User.expenses_version).where(User.id == user_id)
+        ).scalar_one_or_none()
+        return version or 0
+
+    def _bump_expenses_version(self, user_id: int | None) -> None:
+        """Bump the change version of one user (or of every user), in the caller's transaction."""
+        stmt = update(User).values(expenses_version=User.expenses_version + 1)
+        if user_id is not None:
+            stmt = stmt.where(User.id == user_id)
+        self.db.execute(stmt.execution_options(synchronize_session=False))
+
+    # ---------- CATEGORIES ---------- #
+
+    def _category_values(self, user_id: int, name: str | None) -> dict:
+        """Expense column values for a category name, interning the category for the user."""
+        category = self.categories.intern(user_id, name)
+        if category is None:
+            return {"category_id": None, "category": None}
+        category_id, canonical_name = category
+        return {"category_id": category_id, "category": canonical_name}
+
+    # ---------- FILTERING ---------- #
+
+    def _filter_conditions(self, user_id: int, filters: ExpenseFilter) -> list:
+        """WHERE conditions selecting a user's expenses narrowed by the given filters."""
+        conditions = [Expense.user_id == user_id]
+
+        if filters.start_date is not None:
+            conditions.append(Expense.expense_date >= filters.start_date)
+        if filters.end_date is not None:
+            conditions.append(Expense.expense_date <= filters.end_date)
+        if filters.category is not None:
+            conditions.append(Expense.category_id == self.categories.id_query(user_id, filters.category))
+        if filters.min_amount is not None:
+            conditions.append(Expense.amount >= filters.min_amount)
+        if filters.max_amount is not None:
+            conditions.append(Expense.amount <= filters.max_amount)
+
+        return conditions
+
+    def _filtered_query(self, user_id: int, filters: ExpenseFilter):
+        """Build a query for a user's expenses narrowed by the given filters."""
+        return self.db.query(Expense).filter(*self._filter_conditions(user_id, filters))
+
     # ---------- AGGREGATION ---------- #
 
     def get_monthly_expenses_by_category(self, user_id: int, year: int, month: int) -> list[dict]:
-        """Aggregate expenses by category for a given month and year."""
+        """
+        Aggregate expenses by category for a given month and year.
+        Reads the precomputed rollup rows, so the cost depends only on the
+        number of categories, not on the number of expenses. Results are
+        cached per (user, change version, year, month), so every expense
+        write moves readers past the entries cached before it.
+        """
+        # Read the version before the totals: a write committing in between
+        # then files newer totals under the older version, never the reverse
+        version = self.get_expenses_version(user_id)
+        cache_key = summary_cache_key(user_id, version, year, month)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            return [
+                {"category": category, "total_amount": Decimal(total)}
+                for category, total in json.loads(cached)
+            ]
+
+        category = func.coalesce(Category.name, "")
         results = (
-            self.db.query(
-                Expense.category,
-                func.sum(Expense.amount).label("total_amount"),
-            )
+            self.db.query(category, ExpenseMonthlyRollup.total)
+            .select_from(ExpenseMonthlyRollup)
+            .outerjoin(Category, Category.id == ExpenseMonthlyRollup.category_id)
             .filter(
-                Expense.user_id == user_id,
-                func.extract("year", Expense.expense_date) == year,
-                func.extract("month", Expense.expense_date) == month,
+                ExpenseMonthlyRollup.user_id == user_id,
+                ExpenseMonthlyRollup.year == year,
+                ExpenseMonthlyRollup.month == month,
             )
-            .group_by(Expense.category)
+            .order_by(category)
             .all()
         )
 
-        return [
+        summary = [
             {
                 "category": category or "Uncategorized",
-                "total_amount": float(total_amount or 0),
+                "total_amount": total if total is not None else from_minor_units(0),
             }
-            for category, total_amount in results
+            for category, total in results
         ]
+        summary_cache.set(
+            cache_key, json.dumps([[row["category"], str(row["total_amount"])] for row in summary])
+        )
+        return summary
+
+    def get_bucketed_totals(
+        self,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        bucket: str,
+        category: str | None = None,
+    ) -> list[Row]:
+        """
+        Total a user's expenses per (time bucket, category) over an inclusive
+        date range, in one grouped query.
+
+        Each row is (bucket, category, total). On SQLite and PostgreSQL the
+        bucket is already truncated to its start date; on other backends rows
+        are per day and the caller folds them into buckets. Rows are grouped
+        on the category id and only the totals are joined to category names.
+        """
+        bucket_expr = self._bucket_expression(bucket)
+        totals = select(
+            bucket_expr.label("bucket"),
+            Expense.category_id,
+            func.sum(Expense.amount).label("total"),
+        ).where(
+            Expense.user_id == user_id,
+            Expense.expense_date >= start_date,
+            Expense.expense_date <= end_date,
+        )
+        if category is not None:
+            totals = totals.where(Expense.category_id == self.categories.id_query(user_id, category))
+        totals = totals.group_by(bucket_expr, Expense.category_id).subquery()
+
+        return self.db.execute(
+            select(totals.c.bucket, Category.name.label("category"), totals.c.total)
+            .outerjoin(Category, Category.id == totals.c.category_id)
+        ).all()
+
+    def _bucket_expression(self, bucket: str):
+        """SQL expression truncating expense_date to the start of its bucket."""
+        column = Expense.expense_date
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect == "postgresql":
+            # The unit is rendered inline so SELECT and GROUP BY match exactly
+            return cast(func.date_trunc(literal_column(f"'{bucket}'"), column), Date)
+
+        if dialect == "sqlite":
+            if bucket == "day":
+                return func.date(column)
+            if bucket == "week":
+                days_since_monday = (cast(func.strftime("%w", column), Integer) + 6) % 7
+                return func.date(column, literal("-", String) + cast(days_since_monday, String) + " days")
+            if bucket == "month":
+                return func.strftime("%Y-%m-01", column)
+            if bucket == "quarter":
+                quarter_month = (cast(func.strftime("%m", column), Integer) - 1) // 3 * 3 + 1
+                return func.strftime("%Y-", column, type_=String) + func.printf("%02d", quarter_month) + "-01"
+            return func.strftime("%Y-01-01", column)
+
+        return column
+
+    # ---------- MONTHLY ROLLUPS ---------- #
+
+    def _apply_rollup_deltas(self, user_id: int, deltas: RollupDeltas) -> None:
+        """
+        Add accumulated (total, count) changes to the user's rollup rows.
+        Runs inside the caller's transaction; rows whose count drops to zero are removed.
+        """
+        shrinking = False
+        for (year, month, category_id), (total, count) in deltas.items():
+            if count == 0 and total == 0:
+                continue
+            self._upsert_rollup(user_id, year, month, category_id, total, count)
+            shrinking = shrinking or count < 0
+
+        if shrinking:
+            self.db.execute(
+                delete(ExpenseMonthlyRollup).where(
+                    ExpenseMonthlyRollup.user_id == user_id,
+                    ExpenseMonthlyRollup.count <= 0,
+                )
+            )
+
+    def invalidate_cached_summaries(self, user_id: int) -> None:
+        """
+        Drop the user's cached summaries at their current change version once
+        the caller's transaction commits. Expense writes need not call this;
+        it is for deleting the user, whose id and version a later user may
+        reuse. Call it before the rollups are removed, so the months can still be found.
+        """
+        version = self.get_expenses_version(user_id)
+        months = self.db.execute(
+            select(ExpenseMonthlyRollup.year, ExpenseMonthlyRollup.month)
+            .where(ExpenseMonthlyRollup.user_id == user_id)
+            .distinct()
+        ).all()
+        keys = [summary_cache_key(user_id, version, year, month) for year, month in months]
+        if keys:
+            call_after_commit(self.db, lambda: summary_cache.delete(*keys))
+
+    def _upsert_rollup(
+        self, user_id: int, year: int, month: int, category_id: int, total: Decimal, count: int
+    ) -> None:
+        """Increment one rollup row, creating it if needed, in a single statement where supported."""
+        values = {
+            "user_id": user_id,
+            "year": year,
+            "month": month,
+            "category_id": category_id,
+            "total": total,
+            "count": count,
+        }
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = dialect_insert(ExpenseMonthlyRollup).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "year", "month", "category_id"],
+                set_={
+                    "total": ExpenseMonthlyRollup.total + stmt.excluded.total,
+                    "count": ExpenseMonthlyRollup.count + stmt.excluded.count,
+                },
+            )
+            self.db.execute(stmt)
+            return
+
+        result = self.db.execute(
+            update(ExpenseMonthlyRollup)
+            .where(
+                ExpenseMonthlyRollup.user_id == user_id,
+                ExpenseMonthlyRollup.year == year,
+                ExpenseMonthlyRollup.month == month,
+                ExpenseMonthlyRollup.category_id == category_id,
+            )
+            .values(
+                total=ExpenseMonthlyRollup.total + total,
+                count=ExpenseMonthlyRollup.count + count,
+            )
+        )
+        if result.rowcount == 0:
+            self.db.execute(insert(ExpenseMonthlyRollup).values(**values))
+
+    @write_method
+    def rebuild_monthly_rollups(self, user_id: int | None = None) -> int:
+        """
+        Recompute the rollup table from raw expenses, for one user or for everyone.
+        Returns the number of rollup rows written.
+        """
+        year = cast(func.extract("year", Expense.expense_date), Integer)
+        month = cast(func.extract("month", Expense.expense_date), Integer)
+        category = func.coalesce(Expense.category_id, 0)
+
+        source = select(
+            Expense.user_id,
+            year,
+            month,
+            category,
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+        ).group_by(Expense.user_id, year, month, category)
+        clear = delete(ExpenseMonthlyRollup)
+
+        if user_id is not None:
+            source = source.where(Expense.user_id == user_id)
+            clear = clear.where(ExpenseMonthlyRollup.user_id == user_id)
+
+        try:
+            self.db.execute(clear)
+            result = self.db.execute(
+                insert(ExpenseMonthlyRollup).from_select(
+                    ["user_id", "year", "month", "category_id", "total", "count"], source
+                )
+            )
+            # Summaries may change: the new version retires cached summaries
+            # and responses, in every process sharing the database
+            self._bump_expenses_version(user_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result.rowcount
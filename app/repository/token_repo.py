@@ -0,0 +1,147 @@
+# app/repository/token_repo.py
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.events import call_after_commit
+from app.db.models import RefreshToken
+from app.utils.cache import revoked_token_cache
+from app.utils.security import hash_token_id
+from .writes import write_method
+
+
+def _utcnow() -> datetime:
+    """Current time as naive UTC, the way token timestamps are stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RefreshTokenRepository:
+    """Repository layer for the refresh token store."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ---------- ISSUE ---------- #
+
+    @write_method
+    def create_refresh_token(self, token_id: str, family_id: str, user_id: int) -> None:
+        """Record a newly issued refresh token, starting or continuing a family."""
+        self.db.add(self._new_token(token_id, family_id, user_id))
+        self.db.commit()
+
+    def _new_token(self, token_id: str, family_id: str, user_id: int) -> RefreshToken:
+        return RefreshToken(
+            token_hash=hash_token_id(token_id),
+            family_id=family_id,
+            user_id=user_id,
+            expires_at=_utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+
+    # ---------- ROTATE ---------- #
+
+    @write_method
+    def rotate_refresh_token(
+        self, token_id: str, family_id: str, user_id: int, new_token_id: str
+    ) -> bool:
+        """
+        Consume a refresh token and record its successor in the same family,
+        in one transaction. Returns False if the token cannot be used.
+
+        A token that was already used is a replay: its whole family is
+        revoked, so neither the thief nor the victim can continue it.
+        Tokens known to be revoked are rejected from the in-process cache
+        without reading the store.
+        """
+        token_hash = hash_token_id(token_id)
+        if revoked_token_cache.get(("family", family_id)):
+            return False
+
+        try:
+            if revoked_token_cache.get(("token", token_hash)):
+                self._revoke_family(family_id)
+                self.db.commit()
+                return False
+
+            now = _utcnow()
+            consumed = self.db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.token_hash == token_hash,
+                    RefreshToken.family_id == family_id,
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.revoked_at.is_(None),
+                    RefreshToken.expires_at > now,
+                )
+                .values(revoked_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not consumed:
+                # Not usable: unknown, expired, or used before (a replay)
+                reused = self.db.execute(
+                    select(RefreshToken.token_hash).where(
+                        RefreshToken.token_hash == token_hash,
+                        RefreshToken.revoked_at.is_not(None),
+                    )
+                ).first()
+                if reused:
+                    self._revoke_family(family_id)
+                self.db.commit()
+                return False
+
+            self.db.add(self._new_token(new_token_id, family_id, user_id))
+            call_after_commit(self.db, lambda: revoked_token_cache.set(("token", token_hash), True))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return True
+
+    # ---------- REVOKE ---------- #
+
+    @write_method
+    def revoke_refresh_token_family(self, family_id: str) -> int:
+        """Revoke every live token of a family, e.g. on logout. Returns the number revoked."""
+        try:
+            revoked = self._revoke_family(family_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return revoked
+
+    def _revoke_family(self, family_id: str) -> int:
+        """Revoke a family in the caller's transaction; the cache learns of it after commit."""
+        result = self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        call_after_commit(self.db, lambda: revoked_token_cache.set(("family", family_id), True))
+        return result.rowcount
+
+    # ---------- CLEANUP ---------- #
+
+    @write_method
+    def purge_expired_refresh_tokens(self, batch_size: int) -> int:
+        """
+        Delete up to `batch_size` expired tokens, revoked or not, in one statement.
+        Returns the number deleted; callers repeat until it is below batch_size.
+        """
+        expired = (
+            select(RefreshToken.token_hash)
+            .where(RefreshToken.expires_at <= _utcnow())
+            .limit(batch_size)
+        )
+        try:
+            result = self.db.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.token_hash.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return result.rowcount
@@ -1,9 +1,13 @@
 # app/repository/user_repo.py
 
+from sqlalchemy import delete, update
 from sqlalchemy.orm import Session
-from app.db.models import User
-from app.schemas import UserCreate, UserUpdate
-from app.utils.security import hash_password
+from app.db.events import call_after_commit
+from app.db.models import User, Category, Expense, ExpenseMonthlyRollup, RefreshToken
+from app.schemas import UserCreate, UserUpdate, UserPrincipal
+from app.utils.cache import invalidate_categories, invalidate_principal
+from .expense_repo import ExpenseRepository
+from .writes import write_method
 
 
 class UserRepository:
@@ -22,12 +26,26 @@ class UserRepository:
         """Retrieve a user by email address."""
         return self.db.query(User).filter(User.email == email).first()
 
-    # ---------- CREATE ---------- #
+    def get_principal_by_email(self, email: str) -> UserPrincipal | None:
+        """
+        Resolve the identity of a user by email address.
+        Selects only the identity columns; no ORM object or relationship is loaded.
+        """
+        row = (
+            self.db.query(User.id, User.name, User.email)
+            .filter(User.email == email)
+            .first()
+        )
+        return UserPrincipal.model_validate(row) if row else None
 
-    def create_user(self, user_create: UserCreate) -> User:
-        """Create a new user with a hashed password."""
-        hashed_password = hash_password(user_create.password)
+    # ---------- CREATE ---------- #
 
+    @write_method
+    def create_user(self, user_create: UserCreate, hashed_password: str) -> User:
+        """
+        Create a new user with an already hashed password. Hashing is left to
+        the caller, so it never runs inside a write transaction.
+        """
         new_user = User(
             name=user_create.name.strip(),
             email=user_create.email.lower(),
@@ -41,30 +59,68 @@ class UserRepository:
 
     # ---------- UPDATE ---------- #
 
-    def update_user(self, user_id: int, user_update: UserUpdate) -> User | None:
-        """Update user details. Hash password if it is changed."""
+    @write_method
+    def update_user(
+        self, user_id: int, user_update: UserUpdate, hashed_password: str | None = None
+    ) -> User | None:
+        """
+        Update user details. A changed password is stored as `hashed_password`,
+        hashed by the caller beforehand.
+        """
         user = self.get_user_by_id(user_id)
         if not user:
             return None
+        previous_email = user.email
 
         # Apply partial updates dynamically
-        update_data = user_update.model_dump(exclude_unset=True)
+        update_data = user_update.model_dump(exclude_unset=True, exclude={"password"})
+        if hashed_password is not None:
+            update_data["password"] = hashed_password
         for field, value in update_data.items():
-            if field == "password":
-                value = hash_password(value)
             setattr(user, field, value)
 
+        call_after_commit(self.db, lambda: invalidate_principal(previous_email))
         self.db.commit()
         self.db.refresh(user)
         return user
 
+    @write_method
+    def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Replace a stored hash with one made under the current policy, unless the
+        password changed in the meantime. Returns whether the hash was replaced.
+        """
+        result = self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.password == old_hash)
+            .values(password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return bool(result.rowcount)
+
     # ---------- DELETE ---------- #
 
+    @write_method
     def delete_user(self, user_id: int) -> bool:
         """Delete a user by ID."""
         user = self.get_user_by_id(user_id)
         if not user:
             return False
+        expenses = ExpenseRepository(self.db)
+        expenses.unindex_user_expenses(user_id)
+        # Ids are reused once freed, so the next user must not inherit these summaries
+        expenses.invalidate_cached_summaries(user_id)
+        # Remove the expenses in one statement instead of loading the collection
+        self.db.execute(delete(Expense).where(Expense.user_id == user_id))
+        self.db.execute(delete(ExpenseMonthlyRollup).where(ExpenseMonthlyRollup.user_id == user_id))
+        self.db.execute(delete(Category).where(Category.user_id == user_id))
+        self.db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+        email = user.email
         self.db.delete(user)
+        # Under the SQLite writer, commit only releases a savepoint; drop the
+        # cached entries once the deletion is visible to other readers
+        call_after_commit(self.db, lambda: invalidate_principal(email))
+        call_after_commit(self.db, lambda: invalidate_categories(user_id))
         self.db.commit()
         return True
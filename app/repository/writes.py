@@ -0,0 +1,22 @@
+# app/repository/writes.py
+
+from typing import Callable, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+_WRITE_FLAG = "__repository_write__"
+
+
+def write_method(method: F) -> F:
+    """
+    Mark a repository method as a write. Its awaitable version (see
+    AsyncRepository) then runs through run_write, i.e. the SQLite writer
+    queue, instead of a plain threadpool call.
+    """
+    setattr(method, _WRITE_FLAG, True)
+    return method
+
+
+def is_write_method(method: Callable) -> bool:
+    """Whether a repository method was marked with @write_method."""
+    return getattr(method, _WRITE_FLAG, False)
@@ -2,18 +2,21 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-
-from app.db.session import get_db
 from app.schemas import Token
-from app.repository import UserRepository
+from app.repository import (
+    AsyncUserRepository,
+    AsyncRefreshTokenRepository,
+    get_user_repository,
+    get_refresh_token_repository,
+)
 from app.utils.security import (
-    verify_password,
+    verify_and_update_password_async,
     create_access_token,
     create_refresh_token,
     verify_refresh_token,
+    new_token_id,
 )
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -23,24 +26,36 @@ auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
 @auth_router.post("/login", response_model=Token, summary="Authenticate user and return access + refresh tokens")
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db),
+    user_repo: AsyncUserRepository = Depends(get_user_repository),
+    token_repo: AsyncRefreshTokenRepository = Depends(get_refresh_token_repository),
 ):
     """
     Authenticate the user using email and password.
-    Returns an access token and a refresh token upon success.
+    Password verification runs on the bounded hashing pool; returns 503
+    with Retry-After when that pool is saturated.
+    Returns an access token and a refresh token upon success; the refresh
+    token starts a new rotation family in the token store. A password hash
+    below the current hashing policy is replaced by a fresh one.
     """
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_by_email(form_data.username)
+    user = await user_repo.get_user_by_email(form_data.username)
 
-    if not user or not verify_password(form_data.password, user.password):
+    verified, new_hash = (
+        await verify_and_update_password_async(form_data.password, user.password) if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        await user_repo.update_password_hash(user.id, user.password, new_hash)
+
+    token_id, family_id = new_token_id(), new_token_id()
+    await token_repo.create_refresh_token(token_id, family_id, user.id)
 
     access_token = create_access_token({"sub": user.email})
-    refresh_token = create_refresh_token({"sub": user.email})
+    refresh_token = create_refresh_token({"sub": user.email, "jti": token_id, "fam": family_id})
 
     return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
 
@@ -49,11 +64,13 @@ async def login_for_access_token(
 @auth_router.post("/refresh", response_model=Token, summary="Refresh access token using a valid refresh token")
 async def refresh_access_token(
     refresh_token: str,
-    db: Session = Depends(get_db),
+    user_repo: AsyncUserRepository = Depends(get_user_repository),
+    token_repo: AsyncRefreshTokenRepository = Depends(get_refresh_token_repository),
 ):
     """
-    Verify the refresh token and return a new access token.
-    Keeps the same refresh token if still valid.
+    Verify the refresh token and return a new access token together with
+    a new refresh token. Every refresh token can be used once: presenting
+    a used one again revokes all tokens descending from the same login.
     """
     token_data = verify_refresh_token(refresh_token)
     if not token_data:
@@ -62,19 +79,53 @@ async def refresh_access_token(
             detail="Invalid or expired refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_by_email(token_data.username)
+    user = await user_repo.get_principal_by_email(token_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not token_data.token_id or not token_data.family_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    new_access_token = create_access_token({"sub": token_data.username})
+    token_id = new_token_id()
+    rotated = await token_repo.rotate_refresh_token(
+        token_data.token_id, token_data.family_id, user.id, token_id
+    )
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
     return Token(
-        access_token=new_access_token,
-        refresh_token=refresh_token,
+        access_token=create_access_token({"sub": user.email}),
+        refresh_token=create_refresh_token({"sub": user.email, "jti": token_id, "fam": token_data.family_id}),
         token_type="bearer",
     )
+
+
+# ---------- LOGOUT ---------- #
+@auth_router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke a refresh token and every token rotated from the same login",
+)
+async def logout(
+    refresh_token: str,
+    token_repo: AsyncRefreshTokenRepository = Depends(get_refresh_token_repository),
+):
+    """
+    Revoke the refresh token's family, so neither it nor any token it was
+    rotated into can be refreshed again. Access tokens run until they expire.
+    """
+    token_data = verify_refresh_token(refresh_token)
+    if token_data.family_id:
+        await token_repo.revoke_refresh_token_family(token_data.family_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
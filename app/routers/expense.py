@@ -1,17 +1,68 @@
 # app/routers/expense.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Request, status, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.db.routing import get_read_db
 from app.db.session import get_db
-from app.db.models import User
-from app.schemas import ExpenseCreate, ExpenseRead, ExpenseUpdate
-from app.repository import ExpenseRepository
+from app.schemas import (
+    ExpenseCreate,
+    ExpenseRead,
+    ExpenseUpdate,
+    ExpenseFilter,
+    ExpensePage,
+    ExpenseBulkResult,
+    ExpenseBatchUpdate,
+    ExpenseBatchDelete,
+    ExpenseBatchResult,
+    ExpenseAnalyticsQuery,
+    ExpenseAnalytics,
+    UserPrincipal,
+)
+from app.repository import (
+    ExpenseRepository,
+    AsyncExpenseRepository,
+    get_expense_repository,
+    get_expense_read_repository,
+    run_write,
+)
 from app.services.auth_service import get_current_user
+from app.services.expense_import import validate_bulk_payload, import_expenses
+from app.services.expense_export import stream_csv, stream_ndjson, EXPORT_MEDIA_TYPES
+from app.services.expense_analytics import build_analytics, check_bucket_limit
+from app.utils.etag import check_not_modified, weak_etag
+from app.utils.pagination import encode_cursor, decode_cursor, encode_offset_cursor, decode_offset_cursor
 
 expense_router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
 
+def get_expense_filters(filters: Annotated[ExpenseFilter, Query()]) -> ExpenseFilter:
+    """
+    Collect the listing filters from the query string.
+    Kept as its own dependency so the model is expanded into query parameters.
+    """
+    return filters
+
+
+async def check_expenses_etag(
+    response: Response,
+    if_none_match: str | None = Header(None),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
+) -> None:
+    """
+    Tag the response with the user's expense change version, and answer
+    304 Not Modified before any expense query runs when it is unchanged.
+    """
+    version = await expense_repo.get_expenses_version(user.id)
+    check_not_modified(if_none_match, weak_etag(user.id, version), response)
+
+
 # ---------- CREATE EXPENSE ---------- #
 @expense_router.post(
     "/", 
@@ -19,36 +70,230 @@ expense_router = APIRouter(prefix="/expenses", tags=["Expenses"])
     status_code=status.HTTP_201_CREATED,
     summary="Create a new expense"
 )
-def create_expense(
+async def create_expense(
     expense_create: ExpenseCreate,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_repository),
 ):
     """
     Create a new expense entry for the authenticated user.
     """
-    expense_repo = ExpenseRepository(db)
-    new_expense = expense_repo.create_expense(expense_create, user.id)
+    new_expense = await expense_repo.create_expense(expense_create, user.id)
     return new_expense
 
 
+# ---------- BULK IMPORT ---------- #
+@expense_router.post(
+    "/bulk",
+    response_model=ExpenseBulkResult,
+    summary="Import many expenses in one request",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": ExpenseCreate.model_json_schema()}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_create_expenses(
+    request: Request,
+    user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Create expenses from a JSON array or an NDJSON stream of expenses.
+    Items are validated and inserted in batches within one transaction;
+    invalid items are reported by index without aborting the others.
+    """
+    # Decode and validate in the threadpool, so the event loop and the SQLite
+    # writer thread only ever see the inserts
+    batches, errors = await run_in_threadpool(
+        validate_bulk_payload, await request.body(), request.headers.get("content-type", "")
+    )
+
+    return await run_write(
+        db, lambda session: import_expenses(ExpenseRepository(session), batches, errors, user.id)
+    )
+
+
+# ---------- BATCH UPDATE ---------- #
+@expense_router.patch(
+    "/batch",
+    response_model=ExpenseBatchResult,
+    summary="Apply the same changes to many expenses"
+)
+async def batch_update_expenses(
+    batch: ExpenseBatchUpdate,
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_repository),
+):
+    """
+    Set the given fields on every selected expense of the authenticated user,
+    chosen by `ids` or by `filter` (e.g. a category for all descriptions LIKE
+    a pattern within a date range), in a single UPDATE statement.
+    Ids that do not exist or belong to another user are ignored.
+    """
+    matched = await expense_repo.batch_update_expenses(user.id, batch.changes, batch.ids, batch.filter)
+    return ExpenseBatchResult(matched=matched)
+
+
+# ---------- BATCH DELETE ---------- #
+@expense_router.post(
+    "/batch-delete",
+    response_model=ExpenseBatchResult,
+    summary="Delete many expenses"
+)
+async def batch_delete_expenses(
+    batch: ExpenseBatchDelete,
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_repository),
+):
+    """
+    Delete every selected expense of the authenticated user, chosen by `ids`
+    or by `filter`, in a single DELETE statement.
+    Ids that do not exist or belong to another user are ignored.
+    """
+    matched = await expense_repo.batch_delete_expenses(user.id, batch.ids, batch.filter)
+    return ExpenseBatchResult(matched=matched)
+
+
+# ---------- LIST EXPENSES (PAGINATED) ---------- #
+@expense_router.get(
+    "/",
+    response_model=ExpensePage,
+    summary="List expenses for the authenticated user, one page at a time",
+    dependencies=[Depends(check_expenses_etag)],
+)
+async def list_expenses(
+    filters: ExpenseFilter = Depends(get_expense_filters),
+    limit: int = Query(
+        settings.EXPENSE_PAGE_DEFAULT_SIZE, ge=1, le=settings.EXPENSE_PAGE_MAX_SIZE,
+        description="Maximum number of expenses to return",
+    ),
+    cursor: str | None = Query(
+        None, description="The `next_cursor` value returned by the previous page",
+    ),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
+):
+    """
+    Retrieve expenses for the authenticated user, newest first.
+    Supports filtering by date range, category and amount range.
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    items, next_key = await expense_repo.get_expenses_page(user.id, filters, limit, after)
+    return ExpensePage(
+        items=items,
+        next_cursor=encode_cursor(*next_key) if next_key else None,
+    )
+
+
+# ---------- SEARCH EXPENSES ---------- #
+@expense_router.get(
+    "/search",
+    response_model=ExpensePage,
+    summary="Search the authenticated user's expenses by description",
+    dependencies=[Depends(check_expenses_etag)],
+)
+async def search_expenses(
+    q: str = Query(..., min_length=1, max_length=255, description="Words to look for in descriptions"),
+    limit: int = Query(
+        settings.EXPENSE_PAGE_DEFAULT_SIZE, ge=1, le=settings.EXPENSE_PAGE_MAX_SIZE,
+        description="Maximum number of expenses to return",
+    ),
+    cursor: str | None = Query(
+        None, description="The `next_cursor` value returned by the previous page",
+    ),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
+):
+    """
+    Full-text search over descriptions, best match first.
+    Every word must match the start of a word ("amaz" finds "Amazon").
+    """
+    offset = decode_offset_cursor(cursor) if cursor else 0
+
+    items, has_more = await expense_repo.search_expenses(user.id, q, limit, offset)
+    return ExpensePage(
+        items=items,
+        next_cursor=encode_offset_cursor(offset + limit) if has_more else None,
+    )
+
+
+# ---------- EXPORT EXPENSES ---------- #
+@expense_router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export expenses for the authenticated user as CSV or NDJSON"
+)
+def export_expenses(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    filters: ExpenseFilter = Depends(get_expense_filters),
+    user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Stream the authenticated user's expenses, newest first.
+    Rows are read and written in batches, so memory use does not grow
+    with the size of the history. Accepts the same filters as listing.
+    """
+    expense_repo = ExpenseRepository(db)
+    rows = expense_repo.iter_expenses(user.id, filters, settings.EXPORT_BATCH_SIZE)
+    body = stream_csv(rows) if export_format == "csv" else stream_ndjson(rows)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="expenses.{export_format}"'},
+    )
+
+
+# ---------- ANALYTICS ---------- #
+@expense_router.get(
+    "/analytics",
+    response_model=ExpenseAnalytics,
+    summary="Get expense totals by category over time",
+    dependencies=[Depends(check_expenses_etag)],
+)
+async def get_expense_analytics(
+    params: Annotated[ExpenseAnalyticsQuery, Query()],
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
+):
+    """
+    Return a time series of totals per category for the authenticated user,
+    bucketed by day, week, month, quarter or year over any date range.
+    Computed with a single grouped query and returned in columnar form.
+    Raises 400, before querying, if the range spans too many buckets.
+    """
+    check_bucket_limit(params)
+    rows = await expense_repo.get_bucketed_totals(
+        user.id, params.start_date, params.end_date, params.bucket, params.category
+    )
+    return build_analytics(rows, params)
+
+
 # ---------- GET SINGLE EXPENSE ---------- #
 @expense_router.get(
     "/{expense_id}", 
     response_model=ExpenseRead, 
     summary="Get a specific expense by ID"
 )
-def read_expense(
+async def read_expense(
     expense_id: int,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
 ):
     """
     Retrieve a single expense by its ID.
     Ensures that the expense belongs to the authenticated user.
     """
-    expense_repo = ExpenseRepository(db)
-    expense = expense_repo.get_expense_by_id(expense_id)
+    expense = await expense_repo.get_expense_by_id(expense_id)
     if not expense or expense.user_id != user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,17 +306,19 @@ def read_expense(
 @expense_router.get(
     "/user/me",
     response_model=list[ExpenseRead],
-    summary="List all expenses for the authenticated user"
+    summary="List all expenses for the authenticated user",
+    deprecated=True,
+    dependencies=[Depends(check_expenses_etag)],
 )
-def read_expenses_by_user(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def read_expenses_by_user(
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
 ):
     """
     Retrieve all expenses for the currently authenticated user.
+    Deprecated: use the paginated `GET /expenses/` instead.
     """
-    expense_repo = ExpenseRepository(db)
-    return expense_repo.get_expenses_by_user_id(user.id)
+    return await expense_repo.get_expenses_by_user_id(user.id)
 
 
 # ---------- UPDATE EXPENSE ---------- #
@@ -80,31 +327,22 @@ def read_expenses_by_user(
     response_model=ExpenseRead,
     summary="Update an existing expense"
 )
-def update_expense(
+async def update_expense(
     expense_id: int,
     expense_update: ExpenseUpdate,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_repository),
 ):
     """
     Update an existing expense.
     Ensures that the expense belongs to the authenticated user.
     """
-    expense_repo = ExpenseRepository(db)
-    expense = expense_repo.get_expense_by_id(expense_id)
-
-    if not expense or expense.user_id != user.id:
+    updated_expense = await expense_repo.update_expense(expense_id, user.id, expense_update)
+    if not updated_expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found",
         )
-
-    updated_expense = expense_repo.update_expense(expense_id, expense_update)
-    if not updated_expense:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to update expense",
-        )
     return updated_expense
 
 
@@ -114,51 +352,42 @@ def update_expense(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete an expense"
 )
-def delete_expense(
+async def delete_expense(
     expense_id: int,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_repository),
 ):
     """
     Delete an expense by its ID.
     Ensures that the expense belongs to the authenticated user.
     """
-    expense_repo = ExpenseRepository(db)
-    expense = expense_repo.get_expense_by_id(expense_id)
-
-    if not expense or expense.user_id != user.id:
+    success = await expense_repo.delete_expense(expense_id, user.id)
+    if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found",
         )
 
-    success = expense_repo.delete_expense(expense_id)
-    if not success:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to delete expense",
-        )
-
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 # ---------- MONTHLY SUMMARY ---------- #
 @expense_router.get(
     "/summary/{year}/{month}",
-    summary="Get monthly expense summary by category"
+    summary="Get monthly expense summary by category",
+    dependencies=[Depends(check_expenses_etag)],
 )
-def get_monthly_expenses_summary(
-    year: int,
-    month: int,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_monthly_expenses_summary(
+    year: int = Path(..., ge=1, le=9999),
+    month: int = Path(..., ge=1, le=12),
+    user: UserPrincipal = Depends(get_current_user),
+    expense_repo: AsyncExpenseRepository = Depends(get_expense_read_repository),
 ):
     """
     Return a summary of total expenses grouped by category 
     for a given month and year for the authenticated user.
     """
-    expense_repo = ExpenseRepository(db)
-    summary = expense_repo.get_monthly_expenses_by_category(user.id, year, month)
+    summary = await expense_repo.get_monthly_expenses_by_category(user.id, year, month)
     return {
         "year": year,
         "month": month,
@@ -1,13 +1,10 @@
 # app/routers/user.py
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-
-from app.repository import UserRepository
-from app.db.session import get_db
-from app.db.models import User
+from app.repository import AsyncUserRepository, get_user_repository, get_user_read_repository
 from app.services.auth_service import get_current_user
-from app.schemas import UserCreate, UserRead, UserUpdate
+from app.utils.security import hash_password_async
+from app.schemas import UserCreate, UserRead, UserUpdate, UserPrincipal
 
 user_router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -19,20 +16,21 @@ user_router = APIRouter(prefix="/users", tags=["Users"])
     status_code=status.HTTP_201_CREATED,
     summary="Create a new user"
 )
-def create_user(user_create: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user_create: UserCreate, user_repo: AsyncUserRepository = Depends(get_user_repository)):
     """
     Create a new user with a unique email.
-    Raises 400 if email is already registered.
+    Raises 400 if email is already registered, and 503 with Retry-After
+    when the password hashing pool is saturated.
     """
-    user_repo = UserRepository(db)
 
-    if user_repo.get_user_by_email(user_create.email):
+    if await user_repo.get_user_by_email(user_create.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
 
-    return user_repo.create_user(user_create)
+    hashed_password = await hash_password_async(user_create.password)
+    return await user_repo.create_user(user_create, hashed_password)
 
 
 # ---------- READ USER ---------- #
@@ -41,13 +39,12 @@ def create_user(user_create: UserCreate, db: Session = Depends(get_db)):
     response_model=UserRead,
     summary="Get a user by ID"
 )
-def read_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def read_user(user_id: int, user_repo: AsyncUserRepository = Depends(get_user_read_repository), current_user: UserPrincipal = Depends(get_current_user)):
     """
     Retrieve a user by their ID.
     Raises 404 if the user does not exist.
     """
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_by_id(user_id)
+    user = await user_repo.get_user_by_id(user_id)
 
     if not user:
         raise HTTPException(
@@ -70,10 +67,11 @@ def read_user(user_id: int, db: Session = Depends(get_db), current_user: User =
     response_model=UserRead,
     summary="Update user details"
 )
-def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_user(user_id: int, user_update: UserUpdate, user_repo: AsyncUserRepository = Depends(get_user_repository), current_user: UserPrincipal = Depends(get_current_user)):
     """
     Update user fields.
-    Raises 404 if the user does not exist.
+    Raises 404 if the user does not exist. A new password is hashed on the
+    bounded hashing pool (503 with Retry-After when it is saturated).
     """
     if user_id != current_user.id:
         raise HTTPException(
@@ -82,8 +80,10 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
         )
     
 
-    user_repo = UserRepository(db)
-    updated_user = user_repo.update_user(user_id, user_update)
+    hashed_password = None
+    if user_update.password is not None:
+        hashed_password = await hash_password_async(user_update.password)
+    updated_user = await user_repo.update_user(user_id, user_update, hashed_password)
 
 
     if not updated_user:
@@ -102,7 +102,7 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a user by ID"
 )
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_user(user_id: int, user_repo: AsyncUserRepository = Depends(get_user_repository), current_user: UserPrincipal = Depends(get_current_user)):
     """
     Delete a user by ID.
     Raises 404 if the user does not exist.
@@ -114,8 +114,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User
         )
 
 
-    user_repo = UserRepository(db)
-    if not user_repo.delete_user(user_id):
+    if not await user_repo.delete_user(user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
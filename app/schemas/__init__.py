@@ -1,7 +1,22 @@
 # app/schemas/__init__.py
 
-from .user import UserCreate, UserRead, UserUpdate
-from .expense import ExpenseCreate, ExpenseRead, ExpenseUpdate
+from .user import UserCreate, UserRead, UserUpdate, UserPrincipal
+from .expense import (
+    ExpenseCreate,
+    ExpenseRead,
+    ExpenseUpdate,
+    ExpenseFilter,
+    ExpensePage,
+    ExpenseBulkError,
+    ExpenseBulkResult,
+    ExpenseBatchFilter,
+    ExpenseBatchUpdate,
+    ExpenseBatchDelete,
+    ExpenseBatchResult,
+    ExpenseAnalyticsQuery,
+    ExpenseSeries,
+    ExpenseAnalytics,
+)
 from .token import Token, TokenData
 
 __all__ = [
@@ -9,11 +24,23 @@ __all__ = [
     "UserCreate",
     "UserRead",
     "UserUpdate",
+    "UserPrincipal",
 
     # Expense schemas
     "ExpenseCreate",
     "ExpenseRead",
     "ExpenseUpdate",
+    "ExpenseFilter",
+    "ExpensePage",
+    "ExpenseBulkError",
+    "ExpenseBulkResult",
+    "ExpenseBatchFilter",
+    "ExpenseBatchUpdate",
+    "ExpenseBatchDelete",
+    "ExpenseBatchResult",
+    "ExpenseAnalyticsQuery",
+    "ExpenseSeries",
+    "ExpenseAnalytics",
 
     # Token schemas
     "Token",
@@ -1,12 +1,21 @@
 # app/schemas/expense.py
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PlainSerializer, model_validator
 from datetime import datetime, date
-from typing import Optional
+from decimal import Decimal
+from typing import Annotated, Literal, Optional
+
+
+# Exact amount with at most two decimal places, rendered as a JSON number
+Amount = Annotated[
+    Decimal,
+    Field(max_digits=15, decimal_places=2),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
 
 
 class ExpenseBase(BaseModel):
-    amount: float = Field(
+    amount: Amount = Field(
         ..., gt=0, description="The amount of the expense"
     )
     description: str = Field(
@@ -25,7 +34,7 @@ class ExpenseCreate(ExpenseBase):
 
 
 class ExpenseUpdate(BaseModel):
-    amount: float | None = Field(
+    amount: Amount | None = Field(
         None, gt=0, description="The amount of the expense"
     )
     description: str | None = Field(
@@ -44,3 +53,183 @@ class ExpenseRead(ExpenseBase):
     user_id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ExpenseFilter(BaseModel):
+    """
+    Server-side filters shared by the expense listing endpoints.
+    Date bounds are inclusive.
+    """
+    start_date: date | None = Field(
+        None, description="Only include expenses on or after this date"
+    )
+    end_date: date | None = Field(
+        None, description="Only include expenses on or before this date"
+    )
+    category: Optional[str] = Field(
+        None, max_length=100, description="Only include expenses in this category"
+    )
+    min_amount: Amount | None = Field(
+        None, ge=0, description="Only include expenses of at least this amount"
+    )
+    max_amount: Amount | None = Field(
+        None, ge=0, description="Only include expenses of at most this amount"
+    )
+
+    @model_validator(mode="after")
+    def validate_ranges(self):
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date must not be after end_date.")
+        if (
+            self.min_amount is not None
+            and self.max_amount is not None
+            and self.min_amount > self.max_amount
+        ):
+            raise ValueError("min_amount must not be greater than max_amount.")
+        return self
+
+
+class ExpenseBatchFilter(ExpenseFilter):
+    """
+    Filters selecting the expenses a batch operation applies to.
+    """
+    description_like: Optional[str] = Field(
+        None, max_length=255,
+        description="Only include expenses whose description matches this SQL LIKE pattern (% and _ wildcards)",
+    )
+    all: bool = Field(
+        False, description="Apply to every expense; required when no other filter is given"
+    )
+
+    @model_validator(mode="after")
+    def validate_criteria(self):
+        criteria = self.model_dump(exclude={"all"}, exclude_none=True)
+        if not criteria and not self.all:
+            raise ValueError("filter must set at least one criterion, or all: true.")
+        if criteria and self.all:
+            raise ValueError("all cannot be combined with other filters.")
+        return self
+
+
+# Upper bound on explicit ids per batch request
+BATCH_MAX_IDS = 10000
+
+
+class ExpenseBatchSelection(BaseModel):
+    """
+    Selects the expenses of a batch operation, either by id or by filter.
+    Only the authenticated user's expenses are ever matched.
+    """
+    ids: list[int] | None = Field(
+        None, min_length=1, max_length=BATCH_MAX_IDS, description="Ids of the expenses to apply to"
+    )
+    filter: ExpenseBatchFilter | None = Field(
+        None, description="Apply to every expense matching these filters"
+    )
+
+    @model_validator(mode="after")
+    def validate_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ids or filter.")
+        return self
+
+
+class ExpenseBatchUpdate(ExpenseBatchSelection):
+    """
+    Fields to set on every selected expense.
+    """
+    changes: ExpenseUpdate
+
+    @model_validator(mode="after")
+    def validate_changes(self):
+        changes = self.changes.model_dump(exclude_unset=True)
+        if not changes:
+            raise ValueError("changes must set at least one field.")
+        required = [
+            field for field in ("amount", "description", "expense_date")
+            if field in changes and changes[field] is None
+        ]
+        if required:
+            raise ValueError(f"{', '.join(required)} cannot be null.")
+        return self
+
+
+class ExpenseBatchDelete(ExpenseBatchSelection):
+    """
+    Expenses to delete.
+    """
+
+
+class ExpenseBatchResult(BaseModel):
+    """
+    Number of expenses a batch operation matched.
+    """
+    matched: int
+
+
+class ExpensePage(BaseModel):
+    """
+    A single page of expenses ordered by date (newest first).
+    Pass `next_cursor` back as `cursor` to fetch the following page.
+    """
+    items: list[ExpenseRead]
+    next_cursor: str | None = None
+
+
+class ExpenseBulkError(BaseModel):
+    """
+    Validation errors for a single item of a bulk import, by its position in the payload.
+    """
+    index: int
+    errors: list[dict]
+
+
+class ExpenseBulkResult(BaseModel):
+    """
+    Outcome of a bulk import: how many expenses were created and which items were rejected.
+    """
+    created: int
+    failed: int
+    errors: list[ExpenseBulkError]
+
+
+AnalyticsBucket = Literal["day", "week", "month", "quarter", "year"]
+
+
+class ExpenseAnalyticsQuery(BaseModel):
+    """
+    Parameters of a trend query. Date bounds are inclusive; weeks start on Monday.
+    """
+    start_date: date = Field(..., description="First day of the range")
+    end_date: date = Field(..., description="Last day of the range")
+    bucket: AnalyticsBucket = Field("month", description="Size of each time bucket")
+    category: Optional[str] = Field(
+        None, max_length=100, description="Only include expenses in this category"
+    )
+
+    @model_validator(mode="after")
+    def validate_range(self):
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must not be after end_date.")
+        return self
+
+
+class ExpenseSeries(BaseModel):
+    """
+    Totals of one category, one value per bucket.
+    """
+    category: str
+    values: list[Amount]
+
+
+class ExpenseAnalytics(BaseModel):
+    """
+    Columnar time series of expense totals: `buckets` holds the start date
+    of each bucket, and every series and `totals` are aligned with it.
+    """
+    bucket: AnalyticsBucket
+    start_date: date
+    end_date: date
+    buckets: list[date]
+    totals: list[Amount]
+    series: list[ExpenseSeries]
@@ -17,3 +17,7 @@ class TokenData(BaseModel):
     Schema for decoded token data, typically used for verifying the user.
     """
     username: str | None = None
+    issued_at: int | None = None
+    # Refresh tokens only: the token id (jti) and the rotation family it belongs to
+    token_id: str | None = None
+    family_id: str | None = None
@@ -62,3 +62,15 @@ class UserRead(UserBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserPrincipal(BaseModel):
+    """
+    Identity of the authenticated user, resolved from the access token.
+    Holds only the columns the routers need, never the user's expenses.
+    """
+    id: int
+    name: str
+    email: EmailStr
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -2,11 +2,11 @@
 
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 
 from app.db.models import User
-from app.db.session import get_db
-from app.repository import UserRepository
+from app.repository import AsyncUserRepository, get_user_repository
+from app.schemas import UserPrincipal
+from app.utils.cache import principal_cache
 from app.utils.security import verify_password, verify_access_token
 
 
@@ -25,9 +25,14 @@ def authenticate_user(self, email: str, password: str) -> User | None:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User | None:
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_repo: AsyncUserRepository = Depends(get_user_repository),
+) -> UserPrincipal:
     """
-    Retrieve the current user from the access token.
+    Retrieve the identity of the current user from the access token.
+    Only the identity columns are loaded, so this costs a single-row lookup,
+    and resolved principals are cached per token subject and issue time.
     Raises 401 if token is invalid or user does not exist.
     """
     token_data = verify_access_token(token)
@@ -38,8 +43,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_by_email(token_data.username)
+    cache_key = (token_data.username, token_data.issued_at)
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user
+
+    user = await user_repo.get_principal_by_email(token_data.username)
 
     if not user:
         raise HTTPException(
@@ -48,4 +57,5 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    principal_cache.set(cache_key, user)
     return user
@@ -0,0 +1,115 @@
+# app/services/expense_analytics.py
+
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row
+
+from app.core.config import settings
+from app.schemas import ExpenseAnalytics, ExpenseAnalyticsQuery, ExpenseSeries
+from app.utils.money import from_minor_units, to_minor_units
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """
+    Return the first day of the bucket containing `day`. Weeks start on Monday.
+    """
+    if bucket == "day":
+        return day
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return date(day.year, 1, 1)
+
+
+def next_bucket(start: date, bucket: str) -> date:
+    """
+    Return the first day of the bucket following the one starting at `start`.
+    """
+    if bucket == "day":
+        return start + timedelta(days=1)
+    if bucket == "week":
+        return start + timedelta(weeks=1)
+    months = {"month": 1, "quarter": 3, "year": 12}[bucket]
+    month_index = start.year * 12 + start.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def iter_buckets(start_date: date, end_date: date, bucket: str) -> Iterator[date]:
+    """
+    Yield the start of every bucket overlapping the inclusive range.
+    """
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        yield current
+        if current.year == date.max.year and current.month == 12:
+            return
+        current = next_bucket(current, bucket)
+
+
+def bucket_count(start_date: date, end_date: date, bucket: str) -> int:
+    """
+    Count the buckets overlapping the inclusive range, in constant time.
+    """
+    first, last = bucket_start(start_date, bucket), bucket_start(end_date, bucket)
+    if bucket in ("day", "week"):
+        return (last - first).days // (1 if bucket == "day" else 7) + 1
+    months = {"month": 1, "quarter": 3, "year": 12}[bucket]
+    month_span = (last.year - first.year) * 12 + last.month - first.month
+    return month_span // months + 1
+
+
+def check_bucket_limit(params: ExpenseAnalyticsQuery) -> None:
+    """
+    Raise 400 if the range spans more buckets than allowed.
+    Meant to run before the grouped query, so oversized ranges cost nothing.
+    """
+    if bucket_count(params.start_date, params.end_date, params.bucket) > settings.ANALYTICS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range spans more than {settings.ANALYTICS_MAX_BUCKETS} buckets, use a larger bucket",
+        )
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def build_analytics(rows: Iterable[Row], params: ExpenseAnalyticsQuery) -> ExpenseAnalytics:
+    """
+    Lay grouped (bucket, category, total) rows out as aligned columns,
+    filling empty buckets with zero. Folding is done in integer cents,
+    so totals stay exact. Call check_bucket_limit before querying the rows.
+    """
+    buckets = list(iter_buckets(params.start_date, params.end_date, params.bucket))
+    position = {start: index for index, start in enumerate(buckets)}
+
+    totals = [0] * len(buckets)
+    series: dict[str, list[int]] = {}
+    for bucket_value, category, total in rows:
+        # Re-truncating is a no-op for SQL-bucketed rows and folds per-day rows
+        index = position[bucket_start(_as_date(bucket_value), params.bucket)]
+        cents = to_minor_units(total or 0)
+        values = series.setdefault(category or "Uncategorized", [0] * len(buckets))
+        values[index] += cents
+        totals[index] += cents
+
+    return ExpenseAnalytics(
+        bucket=params.bucket,
+        start_date=params.start_date,
+        end_date=params.end_date,
+        buckets=buckets,
+        totals=[from_minor_units(cents) for cents in totals],
+        series=[
+            ExpenseSeries(category=name, values=[from_minor_units(cents) for cents in values])
+            for name, values in sorted(series.items())
+        ],
+    )
@@ -0,0 +1,54 @@
+# app/services/expense_export.py
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+from sqlalchemy import Row
+
+EXPORT_COLUMNS = ["id", "expense_date", "amount", "category", "description"]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def stream_csv(rows: Iterable[Row], flush_every: int = 500) -> Iterator[str]:
+    """
+    Render rows as CSV, yielding a chunk every `flush_every` rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([row.id, row.expense_date.isoformat(), row.amount, row.category or "", row.description])
+        if count % flush_every == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterable[Row], flush_every: int = 500) -> Iterator[str]:
+    """
+    Render rows as NDJSON (one JSON object per line), yielding a chunk every `flush_every` rows.
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({
+            "id": row.id,
+            "expense_date": row.expense_date.isoformat(),
+            "amount": float(row.amount),
+            "category": row.category,
+            "description": row.description,
+        }))
+        if len(lines) == flush_every:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
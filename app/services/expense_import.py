@@ -0,0 +1,114 @@
+# app/services/expense_import.py
+
+import json
+from typing import Any, Iterator
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.repository import ExpenseRepository
+from app.schemas import ExpenseCreate, ExpenseBulkError, ExpenseBulkResult
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# Marks an NDJSON line that could not be decoded, so it is reported per item
+_INVALID_JSON = object()
+
+
+def parse_bulk_payload(body: bytes, content_type: str) -> list[Any]:
+    """
+    Decode a bulk import payload into a list of raw items.
+    Accepts a JSON array, or NDJSON (one JSON object per line).
+    Raises 400 if the payload is malformed and 413 if it has too many items.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+
+    if media_type in NDJSON_CONTENT_TYPES:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(_INVALID_JSON)
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid JSON payload",
+            )
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of expenses",
+            )
+
+    if len(items) > settings.BULK_IMPORT_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Too many expenses, the limit is {settings.BULK_IMPORT_MAX_ITEMS} per request",
+        )
+    return items
+
+
+def _validated_batches(
+    items: list[Any], chunk_size: int, errors: list[ExpenseBulkError]
+) -> Iterator[list[ExpenseCreate]]:
+    """
+    Validate items chunk by chunk, yielding the valid expenses of each chunk.
+    Invalid items are appended to `errors` instead of aborting the import.
+    """
+    for start in range(0, len(items), chunk_size):
+        batch = []
+        for index in range(start, min(start + chunk_size, len(items))):
+            item = items[index]
+            if item is _INVALID_JSON:
+                errors.append(ExpenseBulkError(
+                    index=index,
+                    errors=[{"loc": [], "msg": "Invalid JSON", "type": "json_invalid"}],
+                ))
+                continue
+            try:
+                batch.append(ExpenseCreate.model_validate(item))
+            except ValidationError as exc:
+                errors.append(ExpenseBulkError(
+                    index=index,
+                    errors=[
+                        {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+                        for err in exc.errors()
+                    ],
+                ))
+        yield batch
+
+
+def validate_bulk_payload(
+    body: bytes, content_type: str
+) -> tuple[list[list[ExpenseCreate]], list[ExpenseBulkError]]:
+    """
+    Decode and validate a bulk import, returning the valid expenses in
+    insert-sized batches along with the per-item validation errors.
+    CPU-bound: run it in the threadpool, never on the event loop or the
+    SQLite writer thread.
+    """
+    items = parse_bulk_payload(body, content_type)
+    errors: list[ExpenseBulkError] = []
+    batches = list(_validated_batches(items, settings.BULK_IMPORT_CHUNK_SIZE, errors))
+    return batches, errors
+
+
+def import_expenses(
+    expense_repo: ExpenseRepository,
+    batches: list[list[ExpenseCreate]],
+    errors: list[ExpenseBulkError],
+    user_id: int,
+) -> ExpenseBulkResult:
+    """
+    Insert an already validated bulk import in one transaction.
+    Returns the number created along with the per-item validation errors.
+    """
+    created = expense_repo.bulk_create_expenses(batches, user_id)
+    return ExpenseBulkResult(created=created, failed=len(errors), errors=errors)
@@ -0,0 +1,40 @@
+# app/services/token_sweeper.py
+
+import asyncio
+import logging
+
+from app.db.session import SessionLocal
+from app.repository import RefreshTokenRepository, run_write
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_expired_refresh_tokens(batch_size: int) -> int:
+    """
+    Delete every expired refresh token, one batch per write so other
+    writes can run in between. Returns the number deleted.
+    """
+    purged = 0
+    db = SessionLocal()
+    try:
+        while True:
+            deleted = await run_write(
+                db, lambda session: RefreshTokenRepository(session).purge_expired_refresh_tokens(batch_size)
+            )
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+    finally:
+        db.close()
+
+
+async def sweep_expired_refresh_tokens(interval: float, batch_size: int) -> None:
+    """Background loop purging expired refresh tokens every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            purged = await purge_expired_refresh_tokens(batch_size)
+            if purged:
+                logger.info("Purged %d expired refresh tokens", purged)
+        except Exception:
+            logger.exception("Refresh token sweep failed")
@@ -0,0 +1,228 @@
+# app/utils/cache.py
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Protocol
+
+from app.core.config import settings
+
+
+# ---------------------------
+# Bounded TTL cache
+# ---------------------------
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time-to-live.
+    Keeps at most `maxsize` entries, evicting the least recently used first.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a single key if present. Returns whether it was present."""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches the predicate. Returns the count removed."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Return the current size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ---------------------------
+# Pluggable string cache backends
+# ---------------------------
+class CacheBackend(Protocol):
+    """
+    The subset of the Redis client API the response caches rely on,
+    so a redis.Redis client (or a local fake) can be swapped in for memory.
+    """
+
+    def get(self, key: str) -> str | bytes | None: ...
+
+    def set(self, key: str, value: str, ex: int | None = None) -> Any: ...
+
+    def delete(self, *keys: str) -> int: ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend on top of TTLCache."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self._cache.set(key, value, ttl=ex)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        return sum(self._cache.delete(key) for key in keys)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisCacheBackend:
+    """
+    Backend delegating to a Redis client, with every key namespaced by `prefix`.
+    Shared by all workers, so invalidations are seen everywhere at once.
+    Entries expire after `ttl` seconds unless set() is given its own `ex`.
+    """
+
+    def __init__(self, client, prefix: str = "expense-tracker:", ttl: int | None = None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str) -> str | bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> Any:
+        return self.client.set(self.prefix + key, value, ex=self.ttl if ex is None else ex)
+
+    def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        return self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache_backend(url: str | None, maxsize: int, ttl: float) -> CacheBackend:
+    """
+    Build the backend for a cache URL: Redis for redis:// (and rediss://,
+    unix://) URLs, the in-process LRU otherwise.
+    """
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("The redis package is required for a Redis cache URL") from exc
+        return RedisCacheBackend(redis.Redis.from_url(url), ttl=math.ceil(ttl) if ttl > 0 else None)
+    return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
+
+
+# ---------------------------
+# Shared caches
+# ---------------------------
+
+# Resolved principals keyed by (token subject, token issue time).
+# Per-process only: other workers see changes once their entries expire.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(email: str) -> None:
+    """Drop every cached principal resolved for the given token subject."""
+    principal_cache.invalidate(lambda key: key[0] == email)
+
+
+# Interned categories, (id, name), keyed by (user id, category key). Ids never
+# change once assigned, so entries only go away when their user is deleted.
+category_cache = TTLCache(
+    maxsize=settings.CATEGORY_CACHE_MAX_SIZE,
+    ttl=settings.CATEGORY_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_categories(user_id: int) -> None:
+    """Drop every cached category of the given user."""
+    category_cache.invalidate(lambda key: key[0] == user_id)
+
+
+# Revoked refresh tokens, keyed by ("token", token hash) or ("family", family id).
+# Lets replays be rejected without a database read; entries outlive the tokens.
+revoked_token_cache = TTLCache(
+    maxsize=settings.REVOKED_TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+)
+
+
+# Monthly summaries keyed by (user id, expense change version, year, month).
+# Expense writes bump the version, so older entries are never read again and age out.
+summary_cache = create_cache_backend(
+    settings.SUMMARY_CACHE_URL,
+    maxsize=settings.SUMMARY_CACHE_MAX_SIZE,
+    ttl=settings.SUMMARY_CACHE_TTL_SECONDS,
+)
+
+
+def summary_cache_key(user_id: int, version: int, year: int, month: int) -> str:
+    """Cache key of one user's summary for one month, at one expense change version."""
+    return f"summary:{user_id}:{version}:{year}:{month}"
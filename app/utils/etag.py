@@ -0,0 +1,40 @@
+# app/utils/etag.py
+
+from fastapi import HTTPException, Response, status
+
+
+# ---------------------------
+# Conditional request utilities
+# ---------------------------
+def weak_etag(*parts) -> str:
+    """
+    Build a weak ETag from the given version parts, e.g. W/"12.7".
+    """
+    return 'W/"' + ".".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches the ETag, using the weak
+    comparison required for GET (the W/ prefix is ignored on both sides).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def check_not_modified(if_none_match: str | None, etag: str, response: Response) -> None:
+    """
+    Attach the ETag to the response, or raise 304 Not Modified
+    when the client already holds this version.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,21 @@
+# app/utils/money.py
+
+from decimal import Decimal, ROUND_HALF_UP
+
+# Amounts are kept in minor units (cents), two decimal places
+MINOR_UNIT_DIGITS = 2
+
+
+def to_minor_units(amount) -> int:
+    """
+    Convert an amount (Decimal, int, float or numeric string) to integer cents.
+    Floats go through their shortest repr, so 0.1 becomes exactly 10 cents.
+    """
+    if isinstance(amount, float):
+        amount = repr(amount)
+    return int(Decimal(amount).scaleb(MINOR_UNIT_DIGITS).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(cents: int) -> Decimal:
+    """Convert integer cents back to an exact two-decimal amount."""
+    return Decimal(int(cents)).scaleb(-MINOR_UNIT_DIGITS)
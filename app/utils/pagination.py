@@ -0,0 +1,69 @@
+# app/utils/pagination.py
+
+import base64
+import binascii
+import json
+from datetime import date
+
+from fastapi import HTTPException, status
+
+
+# ---------------------------
+# Keyset cursor utilities
+# ---------------------------
+def encode_cursor(expense_date: date, expense_id: int) -> str:
+    """
+    Encode the (expense_date, id) keyset position into an opaque cursor token.
+    """
+    payload = json.dumps([expense_date.isoformat(), expense_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Decode a cursor token back into its (expense_date, id) keyset position.
+    Raises HTTP 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, expense_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(expense_id, int):
+            raise ValueError("Invalid cursor: id must be an integer")
+        return date.fromisoformat(raw_date), expense_id
+
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+# ---------------------------
+# Offset cursor utilities
+# ---------------------------
+def encode_offset_cursor(offset: int) -> str:
+    """
+    Encode a result offset into an opaque cursor token, for ranked results
+    that have no stable keyset to resume from.
+    """
+    payload = json.dumps({"offset": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """
+    Decode an offset cursor token.
+    Raises HTTP 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded.encode()))["offset"]
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("Invalid cursor: offset must be a non-negative integer")
+        return offset
+
+    except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
@@ -0,0 +1,283 @@
+# app/utils/rate_limit.py
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from fastapi.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartException
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.instrumentation import ROUTE_LABEL
+
+
+# ---------------------------
+# Token bucket backends
+# ---------------------------
+class RateLimitBackend(Protocol):
+    """
+    Token buckets keyed by string. Each bucket holds up to `capacity`
+    tokens and refills at `rate` tokens per second.
+    """
+
+    # Whether take() does network I/O and must stay off the event loop
+    blocking: bool
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take one token. Returns 0 when allowed, else the seconds until one is available."""
+        ...
+
+
+class MemoryRateLimitBackend:
+    """
+    In-process token buckets, at most `maxsize` of them. The least recently
+    used bucket is dropped when full, which only ever makes a key less limited.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refill and take atomically on the server, using the server clock so every
+# worker agrees. Returns the wait in milliseconds (Lua numbers return as integers).
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return wait
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets in Redis (or any server speaking its scripting API),
+    shared by all workers. Buckets expire once they would be full again.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "expense-tracker:rate:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        return int(self._script(keys=[self.prefix + key], args=[capacity, rate])) / 1000
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_rate_limit_backend(url: str | None, maxsize: int) -> RateLimitBackend:
+    """
+    Build the backend for a rate limit URL: Redis for redis:// (and
+    rediss://, unix://) URLs, in-process buckets otherwise.
+    """
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("The redis package is required for a Redis rate limit URL") from exc
+        return RedisRateLimitBackend(redis.Redis.from_url(url))
+    return MemoryRateLimitBackend(maxsize=maxsize)
+
+
+# ---------------------------
+# Login throttling
+# ---------------------------
+class LoginRateLimiter:
+    """
+    Throttles login attempts per client address and per account email.
+    Each key may make `attempts` attempts in a burst, refilled evenly over
+    `window_seconds`. A limit of 0 disables that key.
+    """
+
+    def __init__(self, backend: RateLimitBackend, ip_attempts: int, email_attempts: int, window_seconds: float):
+        self.backend = backend
+        self.ip_attempts = ip_attempts
+        self.email_attempts = email_attempts
+        self.window_seconds = window_seconds
+
+        # Counters for monitoring
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, client_ip: str, email: str | None) -> float:
+        """
+        Count one attempt. Returns 0 when allowed, else the seconds to wait.
+        An address over its limit does not use up the email's attempts.
+        """
+        wait = self._take(f"login:ip:{client_ip}", self.ip_attempts)
+        if not wait and email:
+            wait = self._take(f"login:email:{email.strip().lower()}", self.email_attempts)
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def _take(self, key: str, attempts: int) -> float:
+        if attempts <= 0:
+            return 0.0
+        return self.backend.take(key, attempts, attempts / self.window_seconds)
+
+    def clear(self) -> None:
+        """Forget every bucket and reset the counters."""
+        self.backend.clear()
+        self.allowed = self.rejected = 0
+
+    def stats(self) -> dict:
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+login_rate_limiter = LoginRateLimiter(
+    create_rate_limit_backend(settings.LOGIN_RATE_LIMIT_URL, maxsize=settings.LOGIN_RATE_LIMIT_MAX_KEYS),
+    ip_attempts=settings.LOGIN_RATE_LIMIT_IP_ATTEMPTS,
+    email_attempts=settings.LOGIN_RATE_LIMIT_EMAIL_ATTEMPTS,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+
+class LoginRateLimitMiddleware:
+    """
+    ASGI middleware throttling POST `path` before the route runs, so a
+    rejected attempt never reaches the user lookup or bcrypt.
+
+    The email is read from the `username` field of the form body, urlencoded
+    or multipart, which is buffered and replayed to the route. Bodies over
+    `max_body_size` bytes are rejected with 413, so the email limit cannot
+    be dodged by padding the request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: LoginRateLimiter = login_rate_limiter,
+        path: str = "/auth/login",
+        max_body_size: int = 4096,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.path = path
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        # Rejections never reach the router; label them with the login route
+        scope[ROUTE_LABEL] = self.path
+
+        buffered = await self._buffer_body(scope, receive)
+        if buffered is None:
+            response = JSONResponse({"detail": "Login request body too large"}, status_code=413)
+            await response(scope, receive, send)
+            return
+        email = await self._form_username(scope, buffered)
+        client_ip = scope["client"][0] if scope.get("client") else ""
+
+        if self.limiter.backend.blocking:
+            wait = await run_in_threadpool(self.limiter.check, client_ip, email)
+        else:
+            wait = self.limiter.check(client_ip, email)
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many login attempts, please retry later"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def replay() -> Message:
+            if buffered:
+                return buffered.pop(0)
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+    async def _buffer_body(self, scope: Scope, receive: Receive) -> list[Message] | None:
+        """Read the whole body. Returns its messages, or None if it exceeds max_body_size."""
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            return None
+
+        messages: list[Message] = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return messages
+            size += len(message.get("body", b""))
+            if size > self.max_body_size:
+                return None
+            if not message.get("more_body", False):
+                return messages
+
+    @staticmethod
+    async def _form_username(scope: Scope, messages: list[Message]) -> str | None:
+        """The `username` form field, parsed the way the route will parse it."""
+        body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.request")
+
+        async def receive_body() -> Message:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        # Not the route's scope: parse errors are left for the route to report
+        request = Request({key: value for key, value in scope.items() if key != "app"}, receive_body)
+        try:
+            form = await request.form()
+        except MultiPartException:
+            return None
+        try:
+            username = form.get("username")
+        finally:
+            await form.close()
+        return username if isinstance(username, str) and username else None
@@ -1,6 +1,18 @@
 # app/utils/security.py
 
-from passlib.hash import bcrypt
+import asyncio
+import hashlib
+import logging
+import math
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from passlib.context import CryptContext
+from passlib.hash import argon2
 import jwt
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError, PyJWTError
 from datetime import datetime, timedelta, timezone
@@ -8,6 +20,87 @@ from fastapi import HTTPException, status
 
 from app.core.config import settings
 from app.schemas import TokenData
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------
+# Password hashing policy
+# ---------------------------
+
+# Cost when neither PASSWORD_HASH_COST nor calibration sets one:
+# bcrypt log2 rounds, argon2id passes over memory
+DEFAULT_PASSWORD_COSTS = {"bcrypt": 12, "argon2": 3}
+# Policy floors, never undercut by calibration
+MIN_PASSWORD_COSTS = {"bcrypt": 10, "argon2": 2}
+MAX_PASSWORD_COSTS = {"bcrypt": 16, "argon2": 32}
+
+
+def password_context(scheme: str, cost: int) -> CryptContext:
+    """
+    Build the hashing policy: new hashes use `scheme` at `cost`. Hashes of
+    another scheme or a lower cost still verify, but are flagged for rehash.
+    """
+    if scheme not in DEFAULT_PASSWORD_COSTS:
+        raise RuntimeError(f"Unsupported PASSWORD_HASH_SCHEME {scheme!r}")
+    if scheme == "argon2" and not argon2.has_backend():
+        raise RuntimeError("The argon2-cffi package is required for argon2 password hashes")
+    options = {f"{scheme}__default_rounds": cost, f"{scheme}__min_rounds": cost}
+    if scheme == "argon2":
+        options.update(
+            argon2__type="ID",
+            argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_KIB,
+            argon2__parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+        )
+    # bcrypt stays verifiable (and deprecated) after a switch to argon2
+    schemes = list(dict.fromkeys([scheme, "bcrypt"]))
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+def calibrate_password_cost(scheme: str, target_seconds: float, min_cost: int | None = None) -> int:
+    """
+    Pick the highest cost whose hash takes at most `target_seconds` on this
+    host, and never less than the policy floor. One hash is timed at the
+    floor and extrapolated: bcrypt doubles per round, argon2 grows linearly
+    with its passes.
+    """
+    floor = min_cost or MIN_PASSWORD_COSTS[scheme]
+    context = password_context(scheme, floor)
+    elapsed = min(_time_hash(context) for _ in range(3))
+    budget = target_seconds / elapsed
+    if scheme == "bcrypt":
+        cost = floor + math.floor(math.log2(budget)) if budget >= 1 else floor
+    else:
+        cost = math.floor(floor * budget)
+    return max(floor, min(cost, MAX_PASSWORD_COSTS[scheme]))
+
+
+def _time_hash(context: CryptContext) -> float:
+    start = time.perf_counter()
+    context.hash("calibration")
+    return time.perf_counter() - start
+
+
+pwd_context = password_context(
+    settings.PASSWORD_HASH_SCHEME,
+    settings.PASSWORD_HASH_COST or DEFAULT_PASSWORD_COSTS.get(settings.PASSWORD_HASH_SCHEME, 0),
+)
+
+
+def configure_password_hashing() -> int:
+    """
+    Startup step: calibrate the hashing cost to PASSWORD_HASH_TARGET_MS unless
+    PASSWORD_HASH_COST pins it. Returns the cost new hashes will use.
+    """
+    global pwd_context
+    scheme = settings.PASSWORD_HASH_SCHEME
+    if settings.PASSWORD_HASH_COST or settings.PASSWORD_HASH_TARGET_MS <= 0:
+        return settings.PASSWORD_HASH_COST or DEFAULT_PASSWORD_COSTS[scheme]
+    cost = calibrate_password_cost(scheme, settings.PASSWORD_HASH_TARGET_MS / 1000, settings.PASSWORD_HASH_MIN_COST)
+    pwd_context = password_context(scheme, cost)
+    logger.info("Calibrated %s password hashing to cost %d", scheme, cost)
+    return cost
 
 
 # ---------------------------
@@ -15,16 +108,24 @@ from app.schemas import TokenData
 # ---------------------------
 def hash_password(password: str) -> str:
     """
-    Hash a plain text password using bcrypt.
+    Hash a plain text password under the current policy.
     """
-    return bcrypt.hash(password)
+    return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain text password against a hashed password.
     """
-    return bcrypt.verify(plain_password, hashed_password)
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password and, if its hash is below the current policy, rehash it.
+    Returns whether it matched and the replacement hash, or None if none is needed.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -35,59 +136,233 @@ def get_password_hash(password: str) -> str:
 
 
 # ---------------------------
-# JWT token utilities
+# Password hashing worker pool
 # ---------------------------
-def create_access_token(data: dict) -> str:
+class PasswordWorkerPool:
     """
-    Create a JWT access token with a limited expiration.
+    Dedicated, size-limited thread pool for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so threads scale with cores.
+    At most `max_workers + max_queue` jobs may be in flight; beyond that,
+    callers are rejected with HTTP 503 and a Retry-After header instead of
+    queueing without bound.
     """
-    encode_data = data.copy()
-    expires = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    encode_data.update({"exp": expires, "scope": "access_token"})
-    encoded_jwt = jwt.encode(encode_data, settings.SECRET_KEY, settings.ALGORITHM)
-    return encoded_jwt
 
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int):
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
 
-def verify_access_token(token: str) -> TokenData:
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) on the pool and await its result.
+        Raises HTTP 503 if the pool and its queue are full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running jobs to finish."""
+        self._executor.shutdown(wait=True)
+
+
+password_pool = PasswordWorkerPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
+
+async def hash_password_async(password: str) -> str:
     """
-    Verify the access token and return the token data.
-    Raises HTTP 401 if token is invalid or expired.
+    Hash a password on the worker pool without blocking the event loop.
+    """
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the worker pool without blocking the event loop.
     """
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    verify_and_update_password on the worker pool; the rehash runs there too.
+    """
+    return await password_pool.run(verify_and_update_password, plain_password, hashed_password)
+
+
+# ---------------------------
+# JWT keys and verification
+# ---------------------------
+def _prepare_key(algorithm: str, material: str | bytes) -> Any:
+    """Parse key material once into the object PyJWT signs or verifies with."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        scope: str = payload.get("scope")
+        return jwt.get_algorithm_by_name(algorithm).prepare_key(material)
+    except NotImplementedError as exc:
+        raise RuntimeError(f"The cryptography package is required for {algorithm} tokens") from exc
+
+
+def load_signing_key() -> Any:
+    """
+    Load the key new tokens are signed with: SECRET_KEY for HS* algorithms,
+    the PEM private key in JWT_PRIVATE_KEY_FILE otherwise.
+    """
+    if settings.ALGORITHM.startswith("HS"):
+        return _prepare_key(settings.ALGORITHM, settings.SECRET_KEY)
+    if not settings.JWT_PRIVATE_KEY_FILE:
+        raise RuntimeError(f"JWT_PRIVATE_KEY_FILE is required for {settings.ALGORITHM} tokens")
+    return _prepare_key(settings.ALGORITHM, Path(settings.JWT_PRIVATE_KEY_FILE).read_bytes())
+
+
+def load_verification_keys(signing_key: Any) -> dict[str | None, tuple[Any, str]]:
+    """
+    Load the keys tokens are accepted from, by key id: every key of the
+    JWKS in JWT_PUBLIC_KEYS_FILE, or else the (public half of the) signing key.
+    """
+    if settings.JWT_PUBLIC_KEYS_FILE:
+        try:
+            jwks = jwt.PyJWKSet.from_json(Path(settings.JWT_PUBLIC_KEYS_FILE).read_text())
+        except PyJWTError as exc:
+            raise RuntimeError(f"Invalid JWT_PUBLIC_KEYS_FILE: {exc}") from exc
+        return {jwk.key_id: (jwk.key, jwk.algorithm_name) for jwk in jwks.keys}
+
+    public_key = signing_key.public_key() if hasattr(signing_key, "public_key") else signing_key
+    return {settings.JWT_KEY_ID: (public_key, settings.ALGORITHM)}
+
+
+class TokenVerifier:
+    """
+    Verifies JWTs of both scopes against pre-loaded keys, chosen by the
+    token's "kid" header, and keeps the claims of verified tokens until
+    they expire, so a token seen again is neither re-parsed nor re-checked.
+    """
+
+    def __init__(self, keys: dict[str | None, tuple[Any, str]], cache_size: int):
+        self._keys = {kid: (key, [algorithm]) for kid, (key, algorithm) in keys.items()}
+        # With a single key there is nothing to choose, so the header is not read
+        self._only_key = next(iter(self._keys.values())) if len(self._keys) == 1 else None
+        self.cache = TTLCache(maxsize=cache_size, ttl=0)
 
-        if scope != "access_token":
+    def verify(self, token: str, scope: str) -> dict:
+        """
+        Return the claims of a valid, unexpired token of the given scope
+        with a subject. Raises a PyJWTError otherwise.
+        """
+        claims = self.cache.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            expires_at = claims.get("exp")
+            if expires_at is not None:
+                self.cache.set(token, claims, ttl=expires_at - time.time())
+
+        if claims.get("scope") != scope:
             raise InvalidTokenError("Invalid token: incorrect scope")
-        if username is None:
+        if claims.get("sub") is None:
             raise InvalidTokenError("Invalid token: missing subject")
+        return claims
+
+    def _decode(self, token: str) -> dict:
+        entry = self._only_key
+        if entry is None:
+            entry = self._keys.get(jwt.get_unverified_header(token).get("kid"))
+            if entry is None:
+                raise InvalidTokenError("Invalid token: unknown signing key")
+        key, algorithms = entry
+        return jwt.decode(token, key, algorithms=algorithms)
+
+
+signing_key = load_signing_key()
+token_verifier = TokenVerifier(load_verification_keys(signing_key), settings.TOKEN_CACHE_MAX_SIZE)
+
+
+# ---------------------------
+# JWT token utilities
+# ---------------------------
+def _encode_token(payload: dict) -> str:
+    """Sign a token with the current key, naming it in the "kid" header."""
+    headers = {"kid": settings.JWT_KEY_ID} if settings.JWT_KEY_ID else None
+    return jwt.encode(payload, signing_key, settings.ALGORITHM, headers=headers)
 
-        return TokenData(username=username)
+
+def _verify_token(token: str, scope: str, label: str) -> dict:
+    """
+    Verify a token of the given scope and return its claims.
+    Raises HTTP 401 naming the token kind if it is invalid or expired.
+    """
+    try:
+        return token_verifier.verify(token, scope)
 
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Access token has expired",
+            detail=f"{label.capitalize()} has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid access token",
+            detail=f"Invalid {label}",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
 
+def create_access_token(data: dict) -> str:
+    """
+    Create a JWT access token with a limited expiration.
+    """
+    encode_data = data.copy()
+    issued_at = datetime.now(timezone.utc)
+    expires = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    encode_data.update({"exp": expires, "iat": issued_at, "scope": "access_token"})
+    return _encode_token(encode_data)
+
+
+def verify_access_token(token: str) -> TokenData:
+    """
+    Verify the access token and return the token data.
+    Raises HTTP 401 if token is invalid or expired.
+    """
+    payload = _verify_token(token, "access_token", "access token")
+    return TokenData(username=payload["sub"], issued_at=payload.get("iat"))
+
+
+def new_token_id() -> str:
+    """
+    Generate a random identifier for a refresh token (jti) or token family.
+    """
+    return secrets.token_hex(16)
+
+
+def hash_token_id(token_id: str) -> str:
+    """
+    Hash a refresh token id for storage, so the store never holds usable ids.
+    """
+    return hashlib.sha256(token_id.encode()).hexdigest()
+
+
 def create_refresh_token(data: dict) -> str:
     """
     Create a JWT refresh token with a longer expiration.
+    Pass "jti" and "fam" claims to make it a stored, rotating token.
     """
     encode_data = data.copy()
     expires = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     encode_data.update({"exp": expires, "scope": "refresh_token"})
-    encoded_jwt = jwt.encode(encode_data, settings.SECRET_KEY, settings.ALGORITHM)
-    return encoded_jwt
+    return _encode_token(encode_data)
 
 
 def verify_refresh_token(token: str) -> TokenData:
@@ -95,27 +370,5 @@ def verify_refresh_token(token: str) -> TokenData:
     Verify the refresh token and return the token data.
     Raises HTTP 401 if token is invalid or expired.
     """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        scope: str = payload.get("scope")
-
-        if scope != "refresh_token":
-            raise InvalidTokenError("Invalid token: incorrect scope")
-        if username is None:
-            raise InvalidTokenError("Invalid token: missing subject")
-
-        return TokenData(username=username)
-
-    except ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token has expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    except PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    payload = _verify_token(token, "refresh_token", "refresh token")
+    return TokenData(username=payload["sub"], token_id=payload.get("jti"), family_id=payload.get("fam"))
@@ -0,0 +1,113 @@
+# benchmarks/bench_money_aggregation.py
+"""
+Compare per-category totals over float amounts (the old Float column) with
+totals over integer cents (the Money column), both in SQL and in Python.
+
+Prints the average latency of each path and how far the float totals
+drift from the exact ones.
+
+Usage:
+    python -m benchmarks.bench_money_aggregation [--rows 1000000] [--url sqlite://]
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, create_engine, func, insert, select
+
+from app.db.types import Money
+from app.utils.money import from_minor_units
+
+CATEGORIES = ["Food", "Transport", "Housing", "Fun", "Health"]
+
+metadata = MetaData()
+float_amounts = Table(
+    "bench_float_amounts", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("category", String(100)),
+    Column("amount", Float, nullable=False),
+)
+cent_amounts = Table(
+    "bench_cent_amounts", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("category", String(100)),
+    Column("amount", Money, nullable=False),
+)
+
+
+def seed(connection, rows: int) -> None:
+    batch_float, batch_cents = [], []
+    for _ in range(rows):
+        category = random.choice(CATEGORIES)
+        cents = random.randint(1, 50000)
+        batch_float.append({"category": category, "amount": cents / 100})
+        batch_cents.append({"category": category, "amount": from_minor_units(cents)})
+        if len(batch_float) == 50000:
+            connection.execute(insert(float_amounts), batch_float)
+            connection.execute(insert(cent_amounts), batch_cents)
+            batch_float, batch_cents = [], []
+    if batch_float:
+        connection.execute(insert(float_amounts), batch_float)
+        connection.execute(insert(cent_amounts), batch_cents)
+
+
+def sql_totals(connection, table) -> dict:
+    query = select(table.c.category, func.sum(table.c.amount)).group_by(table.c.category)
+    return dict(connection.execute(query).all())
+
+
+def python_float_totals(amounts: list[float]) -> float:
+    total = 0.0
+    for amount in amounts:
+        total += amount
+    return total
+
+
+def python_cent_totals(cents: list[int]) -> Decimal:
+    return from_minor_units(sum(cents))
+
+
+def timed(fn, runs: int):
+    result = None
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn()
+    return result, (time.perf_counter() - start) / runs * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        seed(connection, args.rows)
+
+        float_result, float_ms = timed(lambda: sql_totals(connection, float_amounts), args.runs)
+        cent_result, cent_ms = timed(lambda: sql_totals(connection, cent_amounts), args.runs)
+        drift = max(abs(Decimal(repr(float_result[c])) - cent_result[c]) for c in cent_result)
+        print("== SQL SUM() per category")
+        print(f"float column   avg {float_ms:.2f} ms")
+        print(f"integer cents  avg {cent_ms:.2f} ms")
+        print(f"max float drift {drift}\n")
+
+        amounts = [row[0] for row in connection.execute(select(float_amounts.c.amount))]
+        cents = [row[0] for row in connection.execute(select(cent_amounts.c.amount.cast(Integer)))]
+
+    float_total, float_ms = timed(lambda: python_float_totals(amounts), args.runs)
+    cent_total, cent_ms = timed(lambda: python_cent_totals(cents), args.runs)
+    print("== Python fold over all rows")
+    print(f"float          avg {float_ms:.2f} ms  total {float_total!r}")
+    print(f"integer cents  avg {cent_ms:.2f} ms  total {cent_total}")
+    metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_monthly_summary.py
+"""
+Compare the monthly summary query before and after the half-open date range
+rewrite, on a synthetic expenses table with the (user_id, expense_date) index.
+The API itself now reads summaries from the monthly rollups; this measures the
+raw-table aggregation those rollups are rebuilt from.
+
+Prints the query plan of both versions and the average latency of each.
+The table is seeded once and reused on later runs.
+
+Usage:
+    python -m benchmarks.bench_monthly_summary [--rows 10000000] [--url sqlite:///./bench.db]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Expense, User
+from app.repository.expense_repo import month_bounds
+
+USERS = 1000
+CATEGORIES = ["Food", "Transport", "Housing", "Fun", "Health", None]
+
+
+def seed(session, rows: int) -> None:
+    if session.query(func.count(Expense.id)).scalar() >= rows:
+        return
+    session.execute(insert(User), [
+        {"name": f"user{i}", "email": f"user{i}@example.com", "password": "x"}
+        for i in range(1, USERS + 1)
+    ])
+    start = date(2015, 1, 1)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "user_id": random.randint(1, USERS),
+            "amount": round(random.uniform(1, 500), 2),
+            "description": "bench",
+            "expense_date": start + timedelta(days=random.randint(0, 3650)),
+            "category": random.choice(CATEGORIES),
+        })
+        if len(batch) == 50000:
+            session.execute(insert(Expense), batch)
+            batch = []
+    if batch:
+        session.execute(insert(Expense), batch)
+    session.commit()
+
+
+def extract_query(session, user_id: int, year: int, month: int):
+    """The summary query as it was written before the rewrite."""
+    return (
+        session.query(Expense.category, func.sum(Expense.amount))
+        .filter(
+            Expense.user_id == user_id,
+            func.extract("year", Expense.expense_date) == year,
+            func.extract("month", Expense.expense_date) == month,
+        )
+        .group_by(Expense.category)
+    )
+
+
+def range_query(session, user_id: int, year: int, month: int):
+    """
+    The summary query after the rewrite: a half-open range on expense_date,
+    so the (user_id, expense_date) index can serve it.
+    """
+    start, end = month_bounds(year, month)
+    query = session.query(Expense.category_id, func.sum(Expense.amount)).filter(
+        Expense.user_id == user_id,
+        Expense.expense_date >= start,
+    )
+    if end is not None:
+        query = query.filter(Expense.expense_date < end)
+    return query.group_by(Expense.category_id)
+
+
+def explain(session, query) -> str:
+    sql = str(query.statement.compile(session.bind, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if session.bind.dialect.name == "sqlite" else "EXPLAIN ANALYZE "
+    return "\n".join(" ".join(str(col) for col in row) for row in session.execute(text(prefix + sql)))
+
+
+def timed(query, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        query.all()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--url", default="sqlite:///./bench_summary.db")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    seed(session, args.rows)
+    if engine.dialect.name == "postgresql":
+        session.execute(text("ANALYZE expenses"))
+
+    new_query = range_query(session, 42, 2020, 6)
+    old_query = extract_query(session, 42, 2020, 6)
+
+    for label, query in (("extract() predicates", old_query), ("half-open date range", new_query)):
+        print(f"== {label}")
+        print(explain(session, query))
+        print(f"avg {timed(query, args.runs):.2f} ms over {args.runs} runs\n")
+
+
+if __name__ == "__main__":
+    main()
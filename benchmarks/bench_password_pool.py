@@ -0,0 +1,46 @@
+# benchmarks/bench_password_pool.py
+"""
+Measure password verification throughput on the bcrypt worker pool.
+
+Runs a burst of concurrent logins' worth of verify_password_async calls
+for increasing pool sizes, to show throughput scaling with cores.
+
+Usage:
+    python -m benchmarks.bench_password_pool [--logins 64]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from app.utils.security import PasswordWorkerPool, hash_password, verify_password
+
+
+async def run_burst(pool: PasswordWorkerPool, hashed: str, logins: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(pool.run(verify_password, "stronG@123", hashed) for _ in range(logins))
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64, help="Concurrent logins per burst")
+    args = parser.parse_args()
+
+    hashed = hash_password("stronG@123")
+    cores = os.cpu_count() or 1
+    sizes = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+
+    print(f"{'workers':>8} {'seconds':>9} {'logins/s':>10}")
+    for workers in sizes:
+        pool = PasswordWorkerPool(max_workers=workers, max_queue=args.logins, retry_after=1)
+        elapsed = asyncio.run(run_burst(pool, hashed, args.logins))
+        pool.shutdown()
+        print(f"{workers:>8} {elapsed:>9.2f} {args.logins / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
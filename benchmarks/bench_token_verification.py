@@ -0,0 +1,53 @@
+# benchmarks/bench_token_verification.py
+"""
+Compare access-token verification paths: a plain jwt.decode per request
+(the old path), the TokenVerifier with its claims cache disabled, and the
+TokenVerifier serving a working set of recently seen tokens from its cache.
+
+Prints verifications per second for each.
+
+Usage:
+    python -m benchmarks.bench_token_verification [--tokens 1000] [--rounds 20]
+"""
+
+import argparse
+import time
+
+import jwt
+
+from app.core.config import settings
+from app.utils.security import TokenVerifier, create_access_token, load_signing_key, load_verification_keys
+
+
+def plain_decode(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def timed(fn, tokens: list[str], rounds: int) -> float:
+    """Verify every token `rounds` times and return verifications per second."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for token in tokens:
+            fn(token)
+    return len(tokens) * rounds / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct tokens in the working set")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"sub": f"user{index}@example.com"}) for index in range(args.tokens)]
+    keys = load_verification_keys(load_signing_key())
+    uncached = TokenVerifier(keys, cache_size=0)
+    cached = TokenVerifier(keys, cache_size=args.tokens)
+
+    print(f"== {args.tokens} tokens x {args.rounds} rounds ({settings.ALGORITHM})")
+    print(f"jwt.decode per request   {timed(plain_decode, tokens, args.rounds):12,.0f} verifications/s")
+    print(f"verifier, no cache       {timed(lambda t: uncached.verify(t, 'access_token'), tokens, args.rounds):12,.0f} verifications/s")
+    print(f"verifier, claims cache   {timed(lambda t: cached.verify(t, 'access_token'), tokens, args.rounds):12,.0f} verifications/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 
@@ -7,6 +7,8 @@ from app.db.models import Base
 from app.db.session import get_db
 from app.core.config import settings
 from app.main import app
+from app.utils.cache import category_cache, principal_cache, revoked_token_cache, summary_cache
+from app.utils.rate_limit import login_rate_limiter
 from fastapi.testclient import TestClient
 
 # Create a new database session for testing
@@ -41,8 +43,49 @@ def clear_data():
         db.execute(table.delete())
     db.commit()
     db.close()
+    principal_cache.clear()
+    summary_cache.clear()
+    category_cache.clear()
+    revoked_token_cache.clear()
+    login_rate_limiter.clear()
 
 @pytest.fixture
 def client():
     with TestClient(app) as c:
         yield c
+
+@pytest.fixture
+def auth_headers(client):
+    # Create a user, log in and return the bearer headers for that user
+    user_payload = {
+        "name": "Auth User",
+        "email": "authuser@gmail.com",
+        "password": "stronG@123"
+    }
+    response = client.post("/users/", json=user_payload)
+    assert response.status_code == 201
+    login_payload = {
+        "username": "authuser@gmail.com",
+        "password": "stronG@123"
+    }
+    response = client.post("/auth/login", data=login_payload)
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def sql_counter():
+    # Record every SQL statement sent and every ORM instance hydrated
+    recorded = {"statements": [], "loaded": []}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        recorded["statements"].append(statement)
+
+    def on_load(target, context):
+        recorded["loaded"].append(target)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(Base, "load", on_load, propagate=True)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", on_execute)
+    event.remove(Base, "load", on_load)
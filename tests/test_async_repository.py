@@ -0,0 +1,54 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.session import async_database_url
+from app.repository import AsyncExpenseRepository, AsyncUserRepository
+from app.schemas import ExpenseCreate, ExpenseFilter, UserCreate
+
+pytest.importorskip("aiosqlite")
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert (
+        async_database_url("postgresql://user:secret@db:5432/expenses")
+        == "postgresql+asyncpg://user:secret@db:5432/expenses"
+    )
+    with pytest.raises(ValueError):
+        async_database_url("mssql://user:secret@db/expenses")
+
+
+def test_async_repositories_on_async_session():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        try:
+            async with session_factory() as db:
+                user_repo = AsyncUserRepository(db)
+                expense_repo = AsyncExpenseRepository(db)
+
+                user = await user_repo.create_user(
+                    UserCreate(name="Async User", email="asyncuser@gmail.com", password="stronG@123"),
+                    "hashed",
+                )
+                principal = await user_repo.get_principal_by_email("asyncuser@gmail.com")
+                assert principal.id == user.id
+
+                for day in (1, 2, 3):
+                    await expense_repo.create_expense(
+                        ExpenseCreate(amount=10.0 * day, description="Async", expense_date=date(2025, 10, day), category="Food"),
+                        user.id,
+                    )
+                items, next_key = await expense_repo.get_expenses_page(user.id, ExpenseFilter(), 2, None)
+                assert [item.expense_date.day for item in items] == [3, 2]
+                assert next_key is not None
+
+                summary = await expense_repo.get_monthly_expenses_by_category(user.id, 2025, 10)
+                assert summary == [{"category": "Food", "total_amount": 60.0}]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -77,3 +77,254 @@ def test_refresh_token_user_not_found(client):
     data = response.json()
     print("Response Data:", repr(data))
     assert data["detail"] == "User not found"   
+
+def test_current_user_is_served_from_principal_cache(client, auth_headers, sql_counter):
+    response = client.get("/expenses/", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    # The principal was resolved above, so this request never looks the user up again
+    # (only the expense change version is read for the ETag)
+    sql_counter["statements"].clear()
+    response = client.get("/expenses/", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("users.email" in statement for statement in sql_counter["statements"])
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert "principal_cache_hits_total" in response.text
+
+
+def test_principal_cache_invalidated_on_user_delete(client):
+    payload = {
+        "name": "Cached User",
+        "email": "cacheduser@gmail.com",
+        "password": "stronG@123"
+    }
+    response = client.post("/users/", json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+    user_id = response.json()["id"]
+    login_payload = {
+        "username": "cacheduser@gmail.com",
+        "password": "stronG@123"
+    }
+    response = client.post("/auth/login", data=login_payload)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Resolve the principal once so it is cached
+    response = client.get(f"/users/{user_id}", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    # Deleting the user must evict the cached principal
+    response = client.delete(f"/users/{user_id}", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.get(f"/users/{user_id}", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_rejected_when_password_pool_is_saturated(client, monkeypatch):
+    from app.utils import security
+    payload = {
+        "name": "Busy User",
+        "email": "busyuser@gmail.com",
+        "password": "stronG@123"
+    }
+    response = client.post("/users/", json=payload)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    # A pool with no queue whose only slot is taken
+    pool = security.PasswordWorkerPool(max_workers=1, max_queue=0, retry_after=2)
+    pool._slots.acquire()
+    monkeypatch.setattr(security, "password_pool", pool)
+
+    login_payload = {
+        "username": "busyuser@gmail.com",
+        "password": "stronG@123"
+    }
+    response = client.post("/auth/login", data=login_payload)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "2"
+    pool._slots.release()
+    pool.shutdown()
+
+
+def _login(client, email="rotate@gmail.com"):
+    client.post("/users/", json={"name": "Rotating User", "email": email, "password": "stronG@123"})
+    response = client.post("/auth/login", data={"username": email, "password": "stronG@123"})
+    return response.json()["refresh_token"]
+
+
+def test_refresh_token_rotation_and_reuse_detection(client, sql_counter):
+    first = _login(client)
+
+    response = client.post(f"/auth/refresh?refresh_token={first}")
+    assert response.status_code == status.HTTP_200_OK
+    second = response.json()["refresh_token"]
+    assert second != first
+
+    # Replaying the used token revokes the whole family, including its successor
+    response = client.post(f"/auth/refresh?refresh_token={first}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Refresh token has been revoked"
+
+    # Known revocations are rejected without reading the token store
+    sql_counter["statements"].clear()
+    response = client.post(f"/auth/refresh?refresh_token={second}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert not any("refresh_tokens" in statement for statement in sql_counter["statements"])
+
+
+def test_reuse_detected_from_store_when_not_cached(client):
+    from app.utils.cache import revoked_token_cache
+    first = _login(client)
+    second = client.post(f"/auth/refresh?refresh_token={first}").json()["refresh_token"]
+
+    # Another worker would not have seen the rotation
+    revoked_token_cache.clear()
+    assert client.post(f"/auth/refresh?refresh_token={first}").status_code == status.HTTP_401_UNAUTHORIZED
+    revoked_token_cache.clear()
+    assert client.post(f"/auth/refresh?refresh_token={second}").status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_logout_revokes_refresh_token(client):
+    token = _login(client)
+    response = client.post(f"/auth/logout?refresh_token={token}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.post(f"/auth/refresh?refresh_token={token}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_expired_refresh_tokens_are_purged_in_batches(client, monkeypatch):
+    import asyncio
+    from datetime import datetime, timedelta
+    from app.db.models import RefreshToken
+    from app.services import token_sweeper
+    from tests.conftest import TestingSessionLocal
+
+    _login(client)
+    db = TestingSessionLocal()
+    try:
+        user_id = db.query(RefreshToken.user_id).scalar()
+        past = datetime.utcnow() - timedelta(days=1)
+        db.add_all([
+            RefreshToken(token_hash=f"{index:064d}", family_id="f" * 32, user_id=user_id, expires_at=past)
+            for index in range(5)
+        ])
+        db.commit()
+
+        monkeypatch.setattr(token_sweeper, "SessionLocal", TestingSessionLocal)
+        assert asyncio.run(token_sweeper.purge_expired_refresh_tokens(batch_size=2)) == 5
+        assert db.query(RefreshToken).count() == 1
+    finally:
+        db.close()
+
+
+def test_login_attempts_throttled_per_email_before_user_lookup(client, monkeypatch, sql_counter):
+    from app.utils.rate_limit import login_rate_limiter
+    monkeypatch.setattr(login_rate_limiter, "email_attempts", 2)
+    client.post("/users/", json={"name": "Target User", "email": "target@gmail.com", "password": "stronG@123"})
+
+    for _ in range(2):
+        response = client.post("/auth/login", data={"username": "target@gmail.com", "password": "guess"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    # Over the limit, even the right password is turned away without touching the database
+    sql_counter["statements"].clear()
+    response = client.post("/auth/login", data={"username": "Target@gmail.com", "password": "stronG@123"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response.headers["Retry-After"]) >= 1
+    assert sql_counter["statements"] == []
+
+    # Other accounts are unaffected
+    response = client.post("/auth/login", data={"username": "other@gmail.com", "password": "guess"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_attempts_throttled_per_client_address(client, monkeypatch):
+    from app.utils.rate_limit import login_rate_limiter
+    monkeypatch.setattr(login_rate_limiter, "ip_attempts", 3)
+
+    for index in range(3):
+        response = client.post("/auth/login", data={"username": f"spray{index}@gmail.com", "password": "guess"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/auth/login", data={"username": "spray9@gmail.com", "password": "guess"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    from app.utils import rate_limit
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    backend = rate_limit.MemoryRateLimitBackend(maxsize=10)
+
+    # A burst of 2, refilling one token every 5 seconds
+    assert backend.take("key", 2, 0.2) == 0
+    assert backend.take("key", 2, 0.2) == 0
+    assert backend.take("key", 2, 0.2) == 5
+    clock[0] += 5
+    assert backend.take("key", 2, 0.2) == 0
+    assert backend.take("key", 2, 0.2) > 0
+
+
+def test_login_rehashes_password_below_policy(client, monkeypatch, sql_counter):
+    from app.db.models import User
+    from app.utils import security
+    from tests.conftest import TestingSessionLocal
+    monkeypatch.setattr(security, "pwd_context", security.password_context("bcrypt", 5))
+    client.post("/users/", json={"name": "Legacy User", "email": "legacy@gmail.com", "password": "stronG@123"})
+
+    # A hash made under an older, weaker policy
+    db = TestingSessionLocal()
+    legacy_hash = security.password_context("bcrypt", 4).hash("stronG@123")
+    db.query(User).filter(User.email == "legacy@gmail.com").update({"password": legacy_hash})
+    db.commit()
+
+    response = client.post("/auth/login", data={"username": "legacy@gmail.com", "password": "stronG@123"})
+    assert response.status_code == status.HTTP_200_OK
+    db.expire_all()
+    upgraded = db.query(User.password).filter(User.email == "legacy@gmail.com").scalar()
+    db.close()
+    assert upgraded.startswith("$2b$05$")
+    assert security.verify_password("stronG@123", upgraded)
+
+    # Hashes meeting the policy are left alone
+    sql_counter["statements"].clear()
+    response = client.post("/auth/login", data={"username": "legacy@gmail.com", "password": "stronG@123"})
+    assert response.status_code == status.HTTP_200_OK
+    assert not any(statement.startswith("UPDATE users") for statement in sql_counter["statements"])
+
+
+def test_password_cost_calibrated_to_target_latency(monkeypatch):
+    from app.core.config import settings
+    from app.utils import security
+    # Pretend a hash at the floor of 10 rounds takes 10 ms
+    monkeypatch.setattr(security, "_time_hash", lambda context: 0.01)
+
+    assert security.calibrate_password_cost("bcrypt", 0.08) == 13
+    assert security.calibrate_password_cost("bcrypt", 0.001) == 10
+    assert security.calibrate_password_cost("bcrypt", 100) == 16
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_TARGET_MS", 45)
+    monkeypatch.setattr(security, "pwd_context", security.pwd_context)
+    assert security.configure_password_hashing() == 12
+    assert security.pwd_context.to_dict()["bcrypt__default_rounds"] == 12
+
+
+def test_login_throttled_per_email_for_multipart_forms(client, monkeypatch):
+    from app.utils.rate_limit import login_rate_limiter
+    monkeypatch.setattr(login_rate_limiter, "email_attempts", 1)
+    boundary = "loginboundary"
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="username"\r\n\r\nvictim@gmail.com\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="password"\r\n\r\nguess\r\n'
+        f"--{boundary}--\r\n"
+    )
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+    response = client.post("/auth/login", content=body, headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/auth/login", content=body, headers=headers)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_oversized_login_body_is_rejected(client):
+    payload = {"username": "victim@gmail.com", "password": "guess", "padding": "x" * 5000}
+    response = client.post("/auth/login", data=payload)
+    assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.config import settings
+from app.db.pool import TimedQueuePool, engine_options
+
+
+def test_engine_options_for_server_database():
+    options = engine_options("postgresql://user:secret@db:5432/expenses")
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_pre_ping"] == settings.DB_POOL_PRE_PING
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+
+
+def test_engine_options_for_sqlite():
+    options = engine_options("sqlite:///./expenses.db")
+    assert options["connect_args"] == {"timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS}
+    assert "pool_pre_ping" not in options
+    # In-memory databases keep SQLAlchemy's default pool
+    assert "poolclass" not in engine_options("sqlite://")
+
+
+def test_timed_pool_counts_checkouts_and_timeouts():
+    engine = create_engine(
+        "sqlite:///./test.db", poolclass=TimedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    try:
+        with engine.connect():
+            assert engine.pool.stats()["checked_out"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+
+        stats = engine.pool.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["wait_seconds"] >= 0.05
+    finally:
+        engine.dispose()
+
+
+def test_metrics_expose_pool_stats(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'db_pool_checked_out{engine="primary"}' in response.text
+    assert 'db_pool_wait_seconds_total{engine="primary"}' in response.text
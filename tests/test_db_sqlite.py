@@ -0,0 +1,85 @@
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, text
+
+from app.db.sqlite import SQLiteWriter, apply_sqlite_pragmas, get_sqlite_writer
+from app.repository import ExpenseRepository, RefreshTokenRepository, UserRepository
+from app.repository.writes import is_write_method
+from tests.conftest import engine as test_engine
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+    apply_sqlite_pragmas(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT NOT NULL)"))
+    yield engine
+    engine.dispose()
+
+
+def test_sqlite_pragmas_applied_on_connect(sqlite_engine):
+    with sqlite_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        # 1 = NORMAL
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+
+
+def test_writer_group_commits_and_isolates_failures(sqlite_engine):
+    writer = SQLiteWriter(sqlite_engine, batch_size=64)
+
+    def insert(body):
+        def write(session):
+            if body is None:
+                session.execute(text("INSERT INTO notes (body) VALUES (NULL)"))
+            else:
+                session.execute(text("INSERT INTO notes (body) VALUES (:body)"), {"body": body})
+            session.commit()
+            return body
+        return write
+
+    bodies = [f"note {i}" for i in range(50)] + [None]
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            futures = list(pool.map(lambda body: writer.submit(insert(body)), bodies))
+        results = [future.exception(timeout=5) or future.result() for future in futures]
+    finally:
+        writer.close()
+
+    # The failing write is rolled back on its own, every other write lands
+    assert results[:-1] == bodies[:-1]
+    assert isinstance(results[-1], Exception)
+    with sqlite_engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM notes")).scalar() == 50
+    assert writer.jobs == 50
+    assert writer.batches <= 50
+
+
+def test_api_writes_go_through_writer_queue(client, auth_headers):
+    writer = get_sqlite_writer(test_engine)
+    jobs_before = writer.jobs
+
+    expense = {"amount": 12.00, "description": "Queued", "expense_date": "2023-10-01"}
+    response = client.post("/expenses/", json=expense, headers=auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert writer.jobs == jobs_before + 1
+
+    response = client.get(f"/expenses/{response.json()['id']}", headers=auth_headers)
+    assert response.json()["description"] == "Queued"
+
+
+def test_committing_repository_methods_route_through_writer():
+    # A method that commits but is not marked would bypass the writer queue
+    for repository_class in (ExpenseRepository, UserRepository, RefreshTokenRepository):
+        for name, method in vars(repository_class).items():
+            if name.startswith("_") or not callable(method):
+                continue
+            if ".commit()" in inspect.getsource(method):
+                assert is_write_method(method), f"{repository_class.__name__}.{name}"
+
+    assert is_write_method(UserRepository.delete_user)
+    assert not is_write_method(ExpenseRepository.get_expenses_page)
+    assert not is_write_method(UserRepository.get_principal_by_email)
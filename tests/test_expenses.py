@@ -1,5 +1,10 @@
+import json
+import re
+
 from fastapi import status
 
+from app.utils.cache import principal_cache
+
 def test_create_expense_success(client):
     # First, create a user to associate the expense with
     user_payload = {
@@ -181,3 +186,656 @@ def test_delete_expense_unauthorized(client):
 
 
 
+def test_list_expenses_paginates_with_cursor(client, auth_headers):
+    expenses = [
+        {"amount": 10.00, "description": "Coffee", "expense_date": "2023-10-01", "category": "Food"},
+        {"amount": 20.00, "description": "Bus", "expense_date": "2023-10-02", "category": "Transport"},
+        {"amount": 30.00, "description": "Lunch", "expense_date": "2023-10-02", "category": "Food"},
+        {"amount": 40.00, "description": "Cinema", "expense_date": "2023-10-03", "category": "Fun"},
+        {"amount": 50.00, "description": "Dinner", "expense_date": "2023-10-04", "category": "Food"},
+    ]
+    for expense in expenses:
+        response = client.post("/expenses/", json=expense, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    # Walk through every page, two expenses at a time
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/expenses/", params=params, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data["items"]) <= 2
+        seen.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(expenses)
+    assert len({expense["id"] for expense in seen}) == len(expenses)
+    keys = [(expense["expense_date"], expense["id"]) for expense in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_list_expenses_filters(client, auth_headers):
+    expenses = [
+        {"amount": 10.00, "description": "Coffee", "expense_date": "2023-10-01", "category": "Food"},
+        {"amount": 25.00, "description": "Bus", "expense_date": "2023-10-02", "category": "Transport"},
+        {"amount": 30.00, "description": "Lunch", "expense_date": "2023-10-02", "category": "Food"},
+        {"amount": 80.00, "description": "Dinner", "expense_date": "2023-10-04", "category": "Food"},
+    ]
+    for expense in expenses:
+        response = client.post("/expenses/", json=expense, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    params = {
+        "start_date": "2023-10-02",
+        "end_date": "2023-10-04",
+        "category": "Food",
+        "min_amount": 20,
+        "max_amount": 50,
+    }
+    response = client.get("/expenses/", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [expense["description"] for expense in data["items"]] == ["Lunch"]
+    assert data["next_cursor"] is None
+
+
+def test_filters_accept_the_last_representable_date(client, auth_headers):
+    expense = {"amount": 10.00, "description": "Coffee", "expense_date": "2023-10-01", "category": "Food"}
+    client.post("/expenses/", json=expense, headers=auth_headers)
+    params = {"start_date": "2023-10-01", "end_date": "9999-12-31"}
+
+    response = client.get("/expenses/", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["description"] for item in response.json()["items"]] == ["Coffee"]
+
+    response = client.get("/expenses/export", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert "Coffee" in response.text
+
+    batch = {"filter": {"end_date": "9999-12-31"}, "changes": {"description": "Tea"}}
+    response = client.patch("/expenses/batch", json=batch, headers=auth_headers)
+    assert response.json() == {"matched": 1}
+
+
+def test_list_expenses_invalid_params(client, auth_headers):
+    response = client.get("/expenses/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Invalid cursor"
+
+    params = {"start_date": "2023-10-05", "end_date": "2023-10-01"}
+    response = client.get("/expenses/", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_authenticated_request_does_not_load_expense_history(client, auth_headers, sql_counter):
+    expense_ids = []
+    for day in range(1, 21):
+        expense = {"amount": 5.00, "description": "Coffee", "expense_date": f"2023-10-{day:02d}"}
+        response = client.post("/expenses/", json=expense, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        expense_ids.append(response.json()["id"])
+
+    # Measure the cold path, where the principal is not cached yet
+    principal_cache.clear()
+    sql_counter["statements"].clear()
+    sql_counter["loaded"].clear()
+    response = client.get(f"/expenses/{expense_ids[0]}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    # One identity lookup plus one expense lookup, and only that expense is hydrated
+    statements = sql_counter["statements"]
+    assert len(statements) == 2
+    assert not any("JOIN" in statement.upper() for statement in statements)
+    assert len(sql_counter["loaded"]) == 1
+
+
+def test_bulk_import_json_array_reports_invalid_items(client, auth_headers):
+    payload = [
+        {"amount": 12.50, "description": "Coffee beans", "expense_date": "2023-09-01", "category": "Food"},
+        {"amount": -3, "description": "Negative amount"},
+        {"amount": 40.00, "description": "Train ticket", "expense_date": "2023-09-02", "category": "Transport"},
+        {"description": "Missing amount"},
+    ]
+    response = client.post("/expenses/bulk", json=payload, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [error["index"] for error in data["errors"]] == [1, 3]
+
+    response = client.get("/expenses/", headers=auth_headers)
+    descriptions = {expense["description"] for expense in response.json()["items"]}
+    assert descriptions == {"Coffee beans", "Train ticket"}
+
+
+def test_bulk_import_ndjson(client, auth_headers):
+    lines = [
+        '{"amount": 9.99, "description": "Streaming", "expense_date": "2023-09-05"}',
+        'not json',
+        '{"amount": 20, "description": "Books", "expense_date": "2023-09-06", "category": "Education"}',
+    ]
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+    response = client.post("/expenses/bulk", content="\n".join(lines), headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["created"] == 2
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["errors"][0]["type"] == "json_invalid"
+
+
+def test_bulk_import_validates_off_the_sqlite_writer_thread(client, auth_headers, monkeypatch):
+    import threading
+    from app.schemas import ExpenseCreate
+    validating_threads = set()
+    original_validate = ExpenseCreate.model_validate
+
+    def recording_validate(item, *args, **kwargs):
+        validating_threads.add(threading.current_thread().name)
+        return original_validate(item, *args, **kwargs)
+
+    monkeypatch.setattr(ExpenseCreate, "model_validate", recording_validate)
+    payload = [{"amount": 1.00, "description": f"Item {i}", "expense_date": "2023-10-02"} for i in range(3)]
+    response = client.post("/expenses/bulk", json=payload, headers=auth_headers)
+    assert response.json()["created"] == 3
+
+    assert validating_threads
+    assert not any(name.startswith("sqlite-writer") for name in validating_threads)
+
+
+def test_export_expenses_csv_and_ndjson(client, auth_headers):
+    expenses = [
+        {"amount": 15.00, "description": "Coffee, large", "expense_date": "2023-10-03", "category": "Food"},
+        {"amount": 30.00, "description": "Groceries", "expense_date": "2023-10-04", "category": "Food"},
+        {"amount": 100.00, "description": "Monthly Rent", "expense_date": "2023-10-01", "category": "Housing"},
+    ]
+    for expense in expenses:
+        response = client.post("/expenses/", json=expense, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.get("/expenses/export", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0] == "id,expense_date,amount,category,description"
+    assert len(lines) == 4
+    assert lines[2].endswith('"Coffee, large"')
+
+    params = {"format": "ndjson", "category": "Food", "start_date": "2023-10-04"}
+    response = client.get("/expenses/export", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    rows = [json.loads(line) for line in response.text.strip().splitlines()]
+    assert [row["description"] for row in rows] == ["Groceries"]
+
+
+def test_monthly_summary_uses_month_range(client, auth_headers):
+    expenses = [
+        {"amount": 10.00, "description": "Last day of September", "expense_date": "2023-09-30", "category": "Food"},
+        {"amount": 15.00, "description": "Coffee", "expense_date": "2023-10-01", "category": "Food"},
+        {"amount": 30.00, "description": "Groceries", "expense_date": "2023-10-31", "category": "Food"},
+        {"amount": 7.00, "description": "Misc", "expense_date": "2023-10-15"},
+        {"amount": 99.00, "description": "First day of November", "expense_date": "2023-11-01", "category": "Food"},
+    ]
+    for expense in expenses:
+        response = client.post("/expenses/", json=expense, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    summary = {row["category"]: row["total_amount"] for row in response.json()["summary"]}
+    assert summary == {"Food": 45.00, "Uncategorized": 7.00}
+
+    response = client.get("/expenses/summary/2023/13", headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_monthly_summary_follows_updates_and_deletes(client, auth_headers):
+    def summary(year, month):
+        response = client.get(f"/expenses/summary/{year}/{month}", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return {row["category"]: row["total_amount"] for row in response.json()["summary"]}
+
+    first = client.post("/expenses/", json={
+        "amount": 20.00, "description": "Taxi", "expense_date": "2023-10-05", "category": "Transport"
+    }, headers=auth_headers).json()
+    client.post("/expenses/", json={
+        "amount": 5.00, "description": "Bus", "expense_date": "2023-10-06", "category": "Transport"
+    }, headers=auth_headers)
+    assert summary(2023, 10) == {"Transport": 25.00}
+
+    # Moving the date and the category takes the amount out of the old month and category
+    response = client.put(f"/expenses/{first['id']}", json={
+        "expense_date": "2023-11-02", "category": "Travel", "amount": 22.00
+    }, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert summary(2023, 10) == {"Transport": 5.00}
+    assert summary(2023, 11) == {"Travel": 22.00}
+
+    response = client.delete(f"/expenses/{first['id']}", headers=auth_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert summary(2023, 11) == {}
+
+
+def test_rebuild_monthly_rollups_matches_incremental(client, auth_headers):
+    from app.db.models import Category, ExpenseMonthlyRollup
+    from app.repository import ExpenseRepository
+    from tests.conftest import TestingSessionLocal
+
+    payload = [
+        {"amount": 10.00, "description": "A", "expense_date": "2023-01-10", "category": "Food"},
+        {"amount": 11.00, "description": "B", "expense_date": "2023-01-20", "category": "Food"},
+        {"amount": 12.00, "description": "C", "expense_date": "2023-02-01"},
+    ]
+    response = client.post("/expenses/bulk", json=payload, headers=auth_headers)
+    assert response.json()["created"] == 3
+
+    def snapshot(db):
+        rows = db.query(ExpenseMonthlyRollup).order_by(
+            ExpenseMonthlyRollup.year, ExpenseMonthlyRollup.month, ExpenseMonthlyRollup.category_id
+        ).all()
+        return [(row.year, row.month, row.category_id, row.total, row.count) for row in rows]
+
+    db = TestingSessionLocal()
+    try:
+        incremental = snapshot(db)
+        food_id = db.query(Category.id).filter(Category.name == "Food").scalar()
+        assert incremental == [(2023, 1, food_id, 21.0, 2), (2023, 2, 0, 12.0, 1)]
+        assert ExpenseRepository(db).rebuild_monthly_rollups() == 2
+        assert snapshot(db) == incremental
+    finally:
+        db.close()
+
+
+def test_expense_analytics_buckets(client, auth_headers):
+    payload = [
+        {"amount": 10.00, "description": "A", "expense_date": "2023-01-02", "category": "Food"},
+        {"amount": 20.00, "description": "B", "expense_date": "2023-01-08", "category": "Food"},
+        {"amount": 5.00, "description": "C", "expense_date": "2023-02-15", "category": "Transport"},
+        {"amount": 40.00, "description": "D", "expense_date": "2023-04-01", "category": "Food"},
+        {"amount": 99.00, "description": "Out of range", "expense_date": "2023-07-01", "category": "Food"},
+    ]
+    response = client.post("/expenses/bulk", json=payload, headers=auth_headers)
+    assert response.json()["created"] == 5
+
+    params = {"start_date": "2023-01-01", "end_date": "2023-04-30", "bucket": "month"}
+    response = client.get("/expenses/analytics", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["buckets"] == ["2023-01-01", "2023-02-01", "2023-03-01", "2023-04-01"]
+    assert data["totals"] == [30.0, 5.0, 0.0, 40.0]
+    assert data["series"] == [
+        {"category": "Food", "values": [30.0, 0.0, 0.0, 40.0]},
+        {"category": "Transport", "values": [0.0, 5.0, 0.0, 0.0]},
+    ]
+
+    params = {"start_date": "2023-01-01", "end_date": "2023-06-30", "bucket": "quarter"}
+    data = client.get("/expenses/analytics", params=params, headers=auth_headers).json()
+    assert data["buckets"] == ["2023-01-01", "2023-04-01"]
+    assert data["totals"] == [35.0, 40.0]
+
+    # 2023-01-02 is a Monday and 2023-01-08 the Sunday of the same week
+    params = {"start_date": "2023-01-01", "end_date": "2023-01-10", "bucket": "week", "category": "Food"}
+    data = client.get("/expenses/analytics", params=params, headers=auth_headers).json()
+    assert data["buckets"] == ["2022-12-26", "2023-01-02", "2023-01-09"]
+    assert data["totals"] == [0.0, 30.0, 0.0]
+
+    params = {"start_date": "2000-01-01", "end_date": "2023-12-31", "bucket": "day"}
+    response = client.get("/expenses/analytics", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_expense_analytics_up_to_the_last_representable_date(client, auth_headers):
+    expense = {"amount": 7.00, "description": "Far future", "expense_date": "9999-12-31", "category": "Food"}
+    client.post("/expenses/", json=expense, headers=auth_headers)
+
+    params = {"start_date": "9999-11-01", "end_date": "9999-12-31", "bucket": "month"}
+    response = client.get("/expenses/analytics", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["buckets"] == ["9999-11-01", "9999-12-01"]
+    assert data["totals"] == [0.0, 7.0]
+
+
+def test_amounts_are_stored_and_summed_exactly(client, auth_headers):
+    # 0.1 has no exact float representation; a thousand of them must total exactly 100
+    payload = [
+        {"amount": 0.10, "description": "Tip", "expense_date": "2023-10-05", "category": "Food"}
+        for _ in range(1000)
+    ]
+    response = client.post("/expenses/bulk", json=payload, headers=auth_headers)
+    assert response.json()["created"] == 1000
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Food", "total_amount": 100.0}]
+
+    params = {"start_date": "2023-10-01", "end_date": "2023-10-31", "bucket": "month"}
+    data = client.get("/expenses/analytics", params=params, headers=auth_headers).json()
+    assert data["totals"] == [100.0]
+
+    response = client.get("/expenses/", params={"limit": 1}, headers=auth_headers)
+    assert response.json()["items"][0]["amount"] == 0.1
+
+
+def test_create_expense_rejects_fractional_cents(client, auth_headers):
+    expense = {"amount": 10.005, "description": "Too precise", "expense_date": "2023-10-05"}
+    response = client.post("/expenses/", json=expense, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def test_conditional_get_returns_304_until_expenses_change(client, auth_headers, sql_counter):
+    expense = {"amount": 12.00, "description": "Lunch", "expense_date": "2023-10-05", "category": "Food"}
+    response = client.post("/expenses/", json=expense, headers=auth_headers)
+    expense_id = response.json()["id"]
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    # Unchanged: answered from the version lookup alone
+    sql_counter["statements"].clear()
+    headers = {**auth_headers, "If-None-Match": etag}
+    response = client.get("/expenses/summary/2023/10", headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert len(sql_counter["statements"]) == 1
+    assert "expenses_version" in sql_counter["statements"][0]
+
+    # Any expense write changes the version
+    response = client.put(f"/expenses/{expense_id}", json={"amount": 15.00}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get("/expenses/summary/2023/10", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+    assert response.json()["summary"] == [{"category": "Food", "total_amount": 15.0}]
+
+    response = client.get("/expenses/user/me", headers={**auth_headers, "If-None-Match": response.headers["etag"]})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_batch_update_by_ids_and_filter(client, auth_headers, sql_counter):
+    payload = [
+        {"amount": 4.50, "description": "Uber to office", "expense_date": "2023-10-02", "category": "Misc"},
+        {"amount": 5.50, "description": "Uber home", "expense_date": "2023-10-03", "category": "Misc"},
+        {"amount": 8.00, "description": "Uber airport", "expense_date": "2023-11-01", "category": "Misc"},
+        {"amount": 20.00, "description": "Books", "expense_date": "2023-10-04", "category": "Misc"},
+    ]
+    client.post("/expenses/bulk", json=payload, headers=auth_headers)
+
+    # Filter-based: recategorize every October ride in one UPDATE
+    batch = {
+        "filter": {"description_like": "Uber%", "start_date": "2023-10-01", "end_date": "2023-10-31"},
+        "changes": {"category": "Transport"},
+    }
+    sql_counter["statements"].clear()
+    response = client.patch("/expenses/batch", json=batch, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"matched": 2}
+    assert sum(statement.lstrip().upper().startswith("UPDATE EXPENSES") for statement in sql_counter["statements"]) == 1
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [
+        {"category": "Misc", "total_amount": 20.0},
+        {"category": "Transport", "total_amount": 10.0},
+    ]
+
+    # Id-based: move two expenses to November and set their amount
+    items = client.get("/expenses/", params={"category": "Transport"}, headers=auth_headers).json()["items"]
+    batch = {
+        "ids": [item["id"] for item in items],
+        "changes": {"expense_date": "2023-11-15", "amount": 3.00},
+    }
+    response = client.patch("/expenses/batch", json=batch, headers=auth_headers)
+    assert response.json() == {"matched": 2}
+
+    response = client.get("/expenses/summary/2023/11", headers=auth_headers)
+    assert response.json()["summary"] == [
+        {"category": "Misc", "total_amount": 8.0},
+        {"category": "Transport", "total_amount": 6.0},
+    ]
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Misc", "total_amount": 20.0}]
+
+
+def test_batch_rollup_deltas_lock_the_matched_rows():
+    from sqlalchemy.dialects import postgresql
+    from app.db.models import Expense
+    from app.repository.expense_repo import rollup_groups_query
+
+    query = rollup_groups_query([Expense.user_id == 1])
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE" in sql and "GROUP BY" in sql
+
+
+def test_batch_operations_only_touch_own_expenses(client, auth_headers):
+    expense = {"amount": 9.00, "description": "Mine", "expense_date": "2023-10-02"}
+    own_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+
+    client.post("/users/", json={"name": "Other", "email": "other@gmail.com", "password": "stronG@123"})
+    token = client.post("/auth/login", data={"username": "other@gmail.com", "password": "stronG@123"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+
+    batch = {"ids": [own_id], "changes": {"description": "Hijacked"}}
+    assert client.patch("/expenses/batch", json=batch, headers=other_headers).json() == {"matched": 0}
+    assert client.post("/expenses/batch-delete", json={"ids": [own_id]}, headers=other_headers).json() == {"matched": 0}
+    assert client.get(f"/expenses/{own_id}", headers=auth_headers).json()["description"] == "Mine"
+
+
+def test_batch_delete_by_filter(client, auth_headers):
+    payload = [
+        {"amount": 1.00, "description": "Coffee", "expense_date": "2023-10-02", "category": "Food"},
+        {"amount": 2.00, "description": "Coffee", "expense_date": "2023-10-03", "category": "Food"},
+        {"amount": 30.00, "description": "Shoes", "expense_date": "2023-10-04", "category": "Clothes"},
+    ]
+    client.post("/expenses/bulk", json=payload, headers=auth_headers)
+
+    response = client.post("/expenses/batch-delete", json={"filter": {"category": "Food"}}, headers=auth_headers)
+    assert response.json() == {"matched": 2}
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Clothes", "total_amount": 30.0}]
+
+    response = client.post("/expenses/batch-delete", json={"filter": {"all": True}}, headers=auth_headers)
+    assert response.json() == {"matched": 1}
+    assert client.get("/expenses/", headers=auth_headers).json()["items"] == []
+
+
+def test_batch_requests_are_validated(client, auth_headers):
+    # Neither or both selectors
+    response = client.post("/expenses/batch-delete", json={}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    response = client.post("/expenses/batch-delete", json={"ids": [1], "filter": {"all": True}}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    # An empty filter would match everything; that takes an explicit all: true
+    response = client.post("/expenses/batch-delete", json={"filter": {}}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    response = client.patch("/expenses/batch", json={"filter": {}, "changes": {"category": "X"}}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    response = client.post("/expenses/batch-delete", json={"filter": {"all": True, "category": "Food"}}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    # Nothing to change, or a required field set to null
+    response = client.patch("/expenses/batch", json={"ids": [1], "changes": {}}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    response = client.patch("/expenses/batch", json={"ids": [1], "changes": {"amount": None}}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+def _expense_statements(statements):
+    # Statements on the expenses table itself; rollup, search index and change version
+    # bookkeeping run in the same transaction but are not counted here
+    return [s for s in statements if re.search(r"\bexpenses\b", s)]
+
+
+def test_oversized_analytics_range_rejected_before_querying(client, auth_headers, sql_counter):
+    params = {"start_date": "2000-01-01", "end_date": "2023-12-31", "bucket": "day"}
+    response = client.get("/expenses/analytics", params=params, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert _expense_statements(sql_counter["statements"]) == []
+
+
+def test_expense_mutations_run_one_scoped_expenses_statement(client, auth_headers, sql_counter):
+    expense = {"amount": 8.00, "description": "Taxi", "expense_date": "2023-10-02", "category": "Transport"}
+    expense_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+
+    # A change that keeps the expense in the same rollup is one UPDATE ... RETURNING on expenses
+    sql_counter["statements"].clear()
+    response = client.put(f"/expenses/{expense_id}", json={"description": "Cab"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["description"] == "Cab"
+    statements = _expense_statements(sql_counter["statements"])
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE") and "RETURNING" in statements[0]
+    assert "user_id" in statements[0]
+
+    # Moving it between rollups reads the old values once, never the whole expense twice
+    sql_counter["statements"].clear()
+    response = client.put(f"/expenses/{expense_id}", json={"amount": 9.50}, headers=auth_headers)
+    assert response.json()["amount"] == 9.5
+    statements = _expense_statements(sql_counter["statements"])
+    assert [s.split()[0] for s in statements] == ["SELECT", "UPDATE"]
+
+    sql_counter["statements"].clear()
+    response = client.delete(f"/expenses/{expense_id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    statements = _expense_statements(sql_counter["statements"])
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE") and "RETURNING" in statements[0]
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == []
+
+
+def test_expense_mutations_are_scoped_to_owner(client, auth_headers):
+    expense = {"amount": 9.00, "description": "Mine", "expense_date": "2023-10-02"}
+    own_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+
+    client.post("/users/", json={"name": "Other", "email": "other@gmail.com", "password": "stronG@123"})
+    token = client.post("/auth/login", data={"username": "other@gmail.com", "password": "stronG@123"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.put(f"/expenses/{own_id}", json={"amount": 1.00}, headers=other_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = client.put(f"/expenses/{own_id}", json={"description": "Hijacked"}, headers=other_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = client.delete(f"/expenses/{own_id}", headers=other_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/expenses/{own_id}", headers=auth_headers).json()["amount"] == 9.0
+
+
+def test_search_expenses_ranked_and_paginated(client, auth_headers):
+    payload = [
+        {"amount": 12.00, "description": "Uber ride to the airport", "expense_date": "2023-10-01"},
+        {"amount": 8.00, "description": "Uber Eats", "expense_date": "2023-10-02"},
+        {"amount": 30.00, "description": "Amazon order", "expense_date": "2023-10-03"},
+        {"amount": 5.00, "description": "Uber", "expense_date": "2023-10-04"},
+    ]
+    client.post("/expenses/bulk", json=payload, headers=auth_headers)
+
+    response = client.get("/expenses/search", params={"q": "uber", "limit": 2}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    # The shortest description is the closest match
+    assert [item["description"] for item in data["items"]][0] == "Uber"
+    assert len(data["items"]) == 2 and data["next_cursor"]
+
+    response = client.get(
+        "/expenses/search", params={"q": "uber", "limit": 2, "cursor": data["next_cursor"]}, headers=auth_headers
+    )
+    rest = response.json()
+    assert len(rest["items"]) == 1 and rest["next_cursor"] is None
+    found = {item["description"] for item in data["items"] + rest["items"]}
+    assert found == {"Uber", "Uber Eats", "Uber ride to the airport"}
+
+    # Every word must match, as a prefix; query syntax is ignored
+    response = client.get("/expenses/search", params={"q": 'ube "eat*'}, headers=auth_headers)
+    assert [item["description"] for item in response.json()["items"]] == ["Uber Eats"]
+    response = client.get("/expenses/search", params={"q": "!!"}, headers=auth_headers)
+    assert response.json() == {"items": [], "next_cursor": None}
+
+
+def test_search_index_follows_writes(client, auth_headers):
+    search = lambda q: [item["id"] for item in client.get(
+        "/expenses/search", params={"q": q}, headers=auth_headers
+    ).json()["items"]]
+
+    expense = {"amount": 9.00, "description": "Netflix", "expense_date": "2023-10-02"}
+    expense_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+    assert search("netflix") == [expense_id]
+
+    client.put(f"/expenses/{expense_id}", json={"description": "Spotify"}, headers=auth_headers)
+    assert search("netflix") == [] and search("spotify") == [expense_id]
+
+    batch = {"ids": [expense_id], "changes": {"description": "Disney plus"}}
+    client.patch("/expenses/batch", json=batch, headers=auth_headers)
+    assert search("spotify") == [] and search("disney") == [expense_id]
+
+    client.delete(f"/expenses/{expense_id}", headers=auth_headers)
+    assert search("disney") == []
+
+    # Other users' expenses never match
+    client.post("/users/", json={"name": "Other", "email": "other@gmail.com", "password": "stronG@123"})
+    token = client.post("/auth/login", data={"username": "other@gmail.com", "password": "stronG@123"}).json()["access_token"]
+    client.post("/expenses/", json=expense, headers={"Authorization": f"Bearer {token}"})
+    assert search("netflix") == []
+
+
+def test_deleting_a_user_removes_their_expenses_from_the_search_index(client):
+    from sqlalchemy import text
+    from tests.conftest import TestingSessionLocal
+
+    payload = {"name": "Leaving User", "email": "leaving@gmail.com", "password": "stronG@123"}
+    user_id = client.post("/users/", json=payload).json()["id"]
+    token = client.post("/auth/login", data={"username": payload["email"], "password": payload["password"]}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    expenses = [
+        {"amount": 9.00, "description": "Netflix", "expense_date": "2023-10-02"},
+        {"amount": 4.00, "description": "Coffee", "expense_date": "2023-10-03"},
+    ]
+    response = client.post("/expenses/bulk", json=expenses, headers=headers)
+    assert response.json()["created"] == 2
+    ids = [item["id"] for item in client.get("/expenses/user/me", headers=headers).json()]
+
+    assert client.delete(f"/users/{user_id}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+    db = TestingSessionLocal()
+    try:
+        indexed = db.execute(
+            text(f"SELECT count(*) FROM expenses_fts WHERE rowid IN ({','.join(map(str, ids))})")
+        ).scalar()
+    finally:
+        db.close()
+    assert len(ids) == 2 and indexed == 0
+
+
+def test_category_variants_share_one_category(client, auth_headers):
+    payload = [
+        {"amount": 10.00, "description": "A", "expense_date": "2023-10-02", "category": "Food"},
+        {"amount": 5.00, "description": "B", "expense_date": "2023-10-03", "category": "  food "},
+        {"amount": 2.50, "description": "C", "expense_date": "2023-10-04", "category": "FOOD"},
+    ]
+    client.post("/expenses/bulk", json=payload, headers=auth_headers)
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Food", "total_amount": 17.5}]
+
+    # Every expense carries the canonical spelling, and filters match any variant
+    response = client.get("/expenses/", params={"category": "fOOd"}, headers=auth_headers)
+    assert [item["category"] for item in response.json()["items"]] == ["Food", "Food", "Food"]
+    response = client.get("/expenses/", params={"category": "Travel"}, headers=auth_headers)
+    assert response.json()["items"] == []
+
+
+def test_interned_categories_skip_lookup_on_write(client, auth_headers, sql_counter):
+    expense = {"amount": 4.00, "description": "Bus", "expense_date": "2023-10-02", "category": "Transport"}
+    response = client.post("/expenses/", json=expense, headers=auth_headers)
+    assert response.json()["category"] == "Transport"
+
+    sql_counter["statements"].clear()
+    response = client.post("/expenses/", json={**expense, "category": "transport"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["category"] == "Transport"
+    assert not any("categories" in statement for statement in sql_counter["statements"])
@@ -0,0 +1,57 @@
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine
+
+from app.db import routing
+from app.db.models import Base
+
+
+@pytest.fixture
+def replicas(tmp_path, monkeypatch):
+    # Two empty replica databases, so reads served by them return no rows
+    engines = []
+    for name in ("replica_a.db", "replica_b.db"):
+        replica = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(bind=replica)
+        engines.append(replica)
+    monkeypatch.setattr(routing, "read_engines", engines)
+    routing.recent_writers.clear()
+    yield engines
+    routing.recent_writers.clear()
+    for replica in engines:
+        replica.dispose()
+
+
+def test_next_read_engine_round_robin(replicas):
+    picked = [routing.next_read_engine() for _ in range(4)]
+    assert picked[0] is not picked[1]
+    assert picked[:2] == picked[2:]
+
+
+def test_next_read_engine_without_replicas(monkeypatch):
+    monkeypatch.setattr(routing, "read_engines", [])
+    assert routing.next_read_engine() is None
+
+
+def test_reads_stick_to_primary_after_write(client, auth_headers, replicas):
+    expense = {"amount": 20.00, "description": "Fresh", "expense_date": "2023-10-01"}
+    response = client.post("/expenses/", json=expense, headers=auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    expense_id = response.json()["id"]
+
+    # Within the stickiness window the write is visible
+    response = client.get(f"/expenses/{expense_id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    # Once it lapses, reads go to the (stale) replicas
+    routing.recent_writers.clear()
+    response = client.get(f"/expenses/{expense_id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = client.get("/expenses/", headers=auth_headers)
+    assert response.json()["items"] == []
+
+
+def test_failed_write_does_not_pin_client(client, auth_headers, replicas):
+    response = client.put("/expenses/999999", json={"amount": 1.0}, headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert len(routing.recent_writers) == 0
@@ -0,0 +1,51 @@
+import re
+
+from app.core import instrumentation
+from tests.conftest import engine
+
+
+def _sample(text, line):
+    match = re.search(rf"^{re.escape(line)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_are_timed_per_route_with_their_database_work(client, auth_headers):
+    instrumentation.instrument_engine(engine)
+    for histogram in (instrumentation.request_latency, instrumentation.response_size,
+                      instrumentation.request_db_statements, instrumentation.request_db_seconds):
+        histogram.clear()
+
+    expense = {"amount": 12.5, "description": "Coffee", "expense_date": "2023-10-03", "category": "Food"}
+    expense_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+    for _ in range(2):
+        assert client.get(f"/expenses/{expense_id}", headers=auth_headers).status_code == 200
+    assert client.get("/expenses/999999", headers=auth_headers).status_code == 404
+
+    text = client.get("/metrics").text
+    route = 'method="GET",route="/expenses/{expense_id}"'
+    # Concrete paths share the route template's series, split by status
+    assert _sample(text, f'http_request_duration_seconds_count{{{route},status="200"}}') == 2
+    assert _sample(text, f'http_request_duration_seconds_count{{{route},status="404"}}') == 1
+    assert _sample(text, f'http_request_duration_seconds_bucket{{{route},status="200",le="+Inf"}}') == 2
+    assert _sample(text, f"http_response_size_bytes_sum{{{route}}}") > 0
+    assert _sample(text, f"http_request_db_statements_count{{{route}}}") == 3
+    assert _sample(text, f"http_request_db_statements_sum{{{route}}}") >= 3
+    assert _sample(text, f"http_request_db_seconds_sum{{{route}}}") > 0
+    # Writes run on the SQLite writer thread and are still attributed to their request
+    assert _sample(text, 'http_request_db_statements_sum{method="POST",route="/expenses/"}') > 0
+    # Only the /metrics request itself is in flight
+    assert _sample(text, "http_requests_in_flight") == 1
+
+
+def test_throttled_logins_are_recorded_under_the_login_route(client, monkeypatch):
+    from app.utils.rate_limit import login_rate_limiter
+    monkeypatch.setattr(login_rate_limiter, "ip_attempts", 1)
+    instrumentation.request_latency.clear()
+
+    for _ in range(3):
+        client.post("/auth/login", data={"username": "nobody@gmail.com", "password": "guess"})
+
+    text = client.get("/metrics").text
+    route = 'method="POST",route="/auth/login"'
+    assert _sample(text, f'http_request_duration_seconds_count{{{route},status="401"}}') == 1
+    assert _sample(text, f'http_request_duration_seconds_count{{{route},status="429"}}') == 2
@@ -0,0 +1,176 @@
+import fnmatch
+
+import pytest
+from fastapi import status
+
+from app import cli
+from app.db.models import Expense
+from app.repository import ExpenseRepository, expense_repo
+from app.utils.cache import MemoryCacheBackend, RedisCacheBackend, create_cache_backend, summary_cache_key
+from tests.conftest import TestingSessionLocal
+
+
+class FakeRedis:
+    """In-memory stand-in for the parts of redis.Redis the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match="*"):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(expense_repo, "summary_cache", RedisCacheBackend(client, prefix="test:"))
+    return client
+
+
+def test_redis_backend_namespaces_keys():
+    client = FakeRedis()
+    backend = RedisCacheBackend(client, prefix="app:")
+    backend.set("a", "1", ex=30)
+    assert client.data == {"app:a": "1"}
+    assert client.expiry["app:a"] == 30
+    assert backend.get("a") == "1"
+    assert backend.delete("a", "missing") == 1
+    backend.set("b", "2")
+    backend.clear()
+    assert client.data == {}
+
+
+def test_redis_backend_expires_entries_after_configured_ttl():
+    client = FakeRedis()
+    backend = RedisCacheBackend(client, prefix="app:", ttl=3600)
+    backend.set("a", "1")
+    backend.set("b", "2", ex=5)
+    assert client.expiry == {"app:a": 3600, "app:b": 5}
+
+
+def test_redis_backend_gets_the_configured_ttl(monkeypatch):
+    redis = pytest.importorskip("redis")
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, url: FakeRedis()))
+    backend = create_cache_backend("redis://localhost:6379/0", maxsize=10, ttl=90)
+    backend.set("a", "1")
+    assert backend.client.expiry == {"expense-tracker:a": 90}
+
+
+def test_memory_backend_is_bounded_lru():
+    backend = MemoryCacheBackend(maxsize=2, ttl=60)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.delete("a", "c") == 2
+
+
+def test_summary_served_from_cache(client, auth_headers, fake_redis, sql_counter):
+    expense = {"amount": 25.50, "description": "Dinner", "expense_date": "2023-10-05", "category": "Food"}
+    client.post("/expenses/", json=expense, headers=auth_headers)
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Food", "total_amount": 25.5}]
+    assert len(fake_redis.data) == 1
+
+    sql_counter["statements"].clear()
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Food", "total_amount": 25.5}]
+    assert not any("expense_monthly_rollups" in statement for statement in sql_counter["statements"])
+
+
+def test_writes_move_summaries_to_a_new_version(client, auth_headers, fake_redis):
+    expense = {"amount": 10.00, "description": "Gym", "expense_date": "2023-10-05", "category": "Health"}
+    expense_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+
+    for month in (10, 11):
+        client.get(f"/expenses/summary/2023/{month}", headers=auth_headers)
+    assert len(fake_redis.data) == 2
+
+    response = client.put(f"/expenses/{expense_id}", json={"expense_date": "2023-11-20"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/expenses/summary/2023/10", headers=auth_headers).json()["summary"] == []
+    response = client.get("/expenses/summary/2023/11", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Health", "total_amount": 10.0}]
+
+    response = client.delete(f"/expenses/{expense_id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert client.get("/expenses/summary/2023/11", headers=auth_headers).json()["summary"] == []
+
+
+def test_summary_filled_before_a_write_commits_is_never_served(client, auth_headers, fake_redis):
+    expense = {"amount": 10.00, "description": "Gym", "expense_date": "2023-10-05", "category": "Health"}
+    expense_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+    user_id = client.get(f"/expenses/{expense_id}", headers=auth_headers).json()["user_id"]
+    client.get("/expenses/summary/2023/10", headers=auth_headers)
+    db = TestingSessionLocal()
+    try:
+        version = ExpenseRepository(db).get_expenses_version(user_id)
+    finally:
+        db.close()
+
+    # A read that loaded the totals just before this write stores them after it
+    client.put(f"/expenses/{expense_id}", json={"amount": 12.00}, headers=auth_headers)
+    fake_redis.set(f"test:{summary_cache_key(user_id, version, 2023, 10)}", '[["Health", "10.00"]]')
+
+    response = client.get("/expenses/summary/2023/10", headers=auth_headers)
+    assert response.json()["summary"] == [{"category": "Health", "total_amount": 12.0}]
+
+
+def test_deleted_users_summaries_are_not_served_to_a_new_user_with_the_same_id(client, fake_redis):
+    user = {"name": "Gone User", "email": "gone@gmail.com", "password": "stronG@123"}
+
+    def sign_in():
+        user_id = client.post("/users/", json=user).json()["id"]
+        token = client.post("/auth/login", data={"username": user["email"], "password": user["password"]})
+        return user_id, {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+    user_id, headers = sign_in()
+    expense = {"amount": 99.99, "description": "Pharmacy", "expense_date": "2024-01-10", "category": "Medical"}
+    client.post("/expenses/", json=expense, headers=headers)
+    response = client.get("/expenses/summary/2024/1", headers=headers)
+    assert response.json()["summary"] == [{"category": "Medical", "total_amount": 99.99}]
+
+    assert client.delete(f"/users/{user_id}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+    assert fake_redis.data == {}
+
+    # SQLite hands the freed id to the next user
+    new_id, headers = sign_in()
+    assert new_id == user_id
+    assert client.get("/expenses/summary/2024/1", headers=headers).json()["summary"] == []
+
+
+def test_rollups_rebuilt_by_another_process_replace_cached_summaries(client, auth_headers, monkeypatch):
+    expense = {"amount": 10.00, "description": "Gym", "expense_date": "2023-10-05", "category": "Health"}
+    expense_id = client.post("/expenses/", json=expense, headers=auth_headers).json()["id"]
+    assert client.get("/expenses/summary/2023/10", headers=auth_headers).json()["summary"] != []
+
+    # Rollups drifted from the raw rows, e.g. after a manual fix in the database
+    db = TestingSessionLocal()
+    try:
+        db.query(Expense).filter(Expense.id == expense_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    # The CLI runs in its own process, with its own in-memory cache
+    with monkeypatch.context() as patch:
+        patch.setattr(cli, "SessionLocal", TestingSessionLocal)
+        patch.setattr(expense_repo, "summary_cache", MemoryCacheBackend(maxsize=10, ttl=60))
+        cli.main(["rebuild-rollups"])
+
+    assert client.get("/expenses/summary/2023/10", headers=auth_headers).json()["summary"] == []
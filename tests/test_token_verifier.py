@@ -0,0 +1,62 @@
+import json
+import time
+
+import jwt
+import pytest
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+
+from app.utils import security
+from app.utils.security import TokenVerifier
+
+
+def _token(key, kid=None, scope="access_token", expires_in=60, **claims):
+    payload = {"sub": "user@gmail.com", "scope": scope, "exp": int(time.time()) + expires_in, **claims}
+    return jwt.encode(payload, key, "HS256", headers={"kid": kid} if kid else None)
+
+
+def test_verifier_selects_key_by_kid(tmp_path, monkeypatch):
+    jwks = {"keys": [
+        {"kty": "oct", "kid": "old", "alg": "HS256", "k": jwt.utils.base64url_encode(b"old-secret" * 4).decode()},
+        {"kty": "oct", "kid": "new", "alg": "HS256", "k": jwt.utils.base64url_encode(b"new-secret" * 4).decode()},
+    ]}
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps(jwks))
+    monkeypatch.setattr(security.settings, "JWT_PUBLIC_KEYS_FILE", str(path))
+    verifier = TokenVerifier(security.load_verification_keys(None), cache_size=10)
+
+    # Tokens signed before and after a rotation both verify
+    assert verifier.verify(_token(b"old-secret" * 4, kid="old"), "access_token")["sub"] == "user@gmail.com"
+    assert verifier.verify(_token(b"new-secret" * 4, kid="new"), "access_token")["sub"] == "user@gmail.com"
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(_token(b"new-secret" * 4, kid="retired"), "access_token")
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(_token(b"new-secret" * 4, kid="old"), "access_token")
+
+
+def test_verifier_caches_claims_until_expiry(monkeypatch):
+    verifier = TokenVerifier({None: (b"secret" * 6, "HS256")}, cache_size=10)
+    token = _token(b"secret" * 6)
+    verifier.verify(token, "access_token")
+
+    decodes = []
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kwargs: decodes.append(args))
+    assert verifier.verify(token, "access_token")["sub"] == "user@gmail.com"
+    assert decodes == []
+
+    # Scope is still checked on cached claims
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token, "refresh_token")
+    monkeypatch.undo()
+
+    # Expired tokens are rejected and never cached
+    expired = _token(b"secret" * 6, expires_in=-1)
+    with pytest.raises(ExpiredSignatureError):
+        verifier.verify(expired, "access_token")
+    assert verifier.cache.get(expired) is None
+
+
+def test_signed_tokens_name_their_key(monkeypatch):
+    monkeypatch.setattr(security.settings, "JWT_KEY_ID", "2026-10")
+    token = security.create_refresh_token({"sub": "user@gmail.com"})
+    assert jwt.get_unverified_header(token)["kid"] == "2026-10"
+    assert security.verify_refresh_token(token).username == "user@gmail.com"
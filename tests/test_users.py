@@ -253,3 +253,67 @@ def test_delete_user_not_found(client):
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
     data = response.json()
     assert data["detail"] == "Not authenticated"
+
+
+def test_create_user_rejected_when_password_pool_is_saturated(client, monkeypatch):
+    from app.utils import security
+    # A pool with no queue whose only slot is taken
+    pool = security.PasswordWorkerPool(max_workers=1, max_queue=0, retry_after=2)
+    pool._slots.acquire()
+    monkeypatch.setattr(security, "password_pool", pool)
+
+    payload = {"name": "Busy User", "email": "busysignup@gmail.com", "password": "stronG@123"}
+    response = client.post("/users/", json=payload)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "2"
+    pool._slots.release()
+    pool.shutdown()
+
+
+def test_password_hashing_stays_off_the_sqlite_writer_thread(client, monkeypatch):
+    import threading
+    from app.utils import security
+    hashing_threads = []
+    original_hash = security.hash_password
+
+    def recording_hash(password):
+        hashing_threads.append(threading.current_thread().name)
+        return original_hash(password)
+
+    monkeypatch.setattr(security, "hash_password", recording_hash)
+    payload = {"name": "Queued User", "email": "queued@gmail.com", "password": "stronG@123"}
+    user_id = client.post("/users/", json=payload).json()["id"]
+    token = client.post("/auth/login", data={"username": payload["email"], "password": payload["password"]}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    response = client.put(f"/users/{user_id}", json={"password": "neweR@1234"}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    # Signup and password change both hashed, neither inside a queued write
+    assert len(hashing_threads) == 2
+    assert not any(name.startswith("sqlite-writer") for name in hashing_threads)
+
+
+def test_user_caches_invalidated_only_once_the_write_is_committed(client):
+    from app.db.events import GROUP_COMMIT, pop_after_commit_callbacks
+    from app.repository import UserRepository
+    from app.utils.cache import category_cache, principal_cache
+    from tests.conftest import TestingSessionLocal
+
+    payload = {"name": "Cached User", "email": "cached@gmail.com", "password": "stronG@123"}
+    user_id = client.post("/users/", json=payload).json()["id"]
+    principal_cache.set(("cached@gmail.com", 0), "principal")
+    category_cache.set((user_id, "food"), (1, "Food"))
+
+    # As on the SQLite writer, where commit only releases a savepoint of the group
+    db = TestingSessionLocal()
+    db.info[GROUP_COMMIT] = True
+    try:
+        assert UserRepository(db).delete_user(user_id)
+        assert principal_cache.get(("cached@gmail.com", 0)) == "principal"
+        assert category_cache.get((user_id, "food")) == (1, "Food")
+        for callback in pop_after_commit_callbacks(db):
+            callback()
+    finally:
+        db.close()
+    assert principal_cache.get(("cached@gmail.com", 0)) is None
+    assert category_cache.get((user_id, "food")) is None